@@ -0,0 +1,102 @@
+'''
+Monte Carlo estimates of match-win probability that stop as soon as they are precise enough.
+'''
+
+import math
+from vectorized import simulate_matches
+from streams import new_root_seed, numpy_stream
+
+class Estimate:
+    '''A Monte Carlo estimate of a match-win probability with its confidence interval.'''
+    def __init__(self, estimate, low, high, samples):
+        """
+        Initialize a new Estimate instance.
+
+        Parameters:
+        estimate (float): The estimated probability.
+        low (float): The lower end of the confidence interval.
+        high (float): The upper end of the confidence interval.
+        samples (int): Number of matches simulated.
+        """
+        self.estimate = estimate
+        self.low = low
+        self.high = high
+        self.samples = samples
+
+    def width(self):
+        """Return the width of the confidence interval."""
+        return self.high - self.low
+
+    def __str__(self):
+        return f"{self.estimate:.4f} [{self.low:.4f}, {self.high:.4f}] from {self.samples} matches"
+
+def wilson_interval(wins, n, z):
+    """
+    Return the Wilson score interval for wins out of n.
+
+    Unlike the normal approximation it stays wide when every match has the same winner.
+    """
+    centre = (wins + z * z / 2) / (n + z * z)
+    spread = z * math.sqrt(wins * (n - wins) / n + z * z / 4) / (n + z * z)
+    return centre - spread, centre + spread
+
+def estimate_match_win(player_1, player_2, target_width=0.01, batch_size=500, max_samples=10 ** 6,
+                       z=1.96, antithetic=True, seed=None):
+    """
+    Simulate batches of matches until the confidence interval is narrow enough.
+
+    Parameters:
+    player_1 (Player): The first player, who serves first in every set.
+    player_2 (Player): The second player.
+    target_width (float, optional): Stop once the interval is at most this wide.
+    batch_size (int, optional): Number of matches in the first batch. Every later batch is twice
+    as large as the one before, so lopsided pairings stop after a few hundred matches while
+    close ones aren't slowed down by checking too often.
+    max_samples (int, optional): Stop after this many matches even if the target isn't reached.
+    z (float, optional): Normal quantile of the interval. Defaults to 95 %.
+    antithetic (bool, optional): Pair every match with one played on mirrored rolls and use the
+    pair averages as samples, which lowers the variance of the estimate.
+    seed (int, optional): Root seed. Batch b always uses stream b, so estimates for different
+    pairings made with the same seed share their rolls (common random numbers) and their
+    differences are much less noisy than the estimates themselves.
+
+    Returns:
+    Estimate: The estimate, its interval and the number of matches used.
+    """
+    if seed is None:
+        seed = new_root_seed()
+
+    # Running sums over samples, which are single matches or antithetic pair averages
+    count = 0
+    total = 0.0
+    squares = 0.0
+    wins = 0
+    samples = 0
+    batch = 0
+    while True:
+        batch_size += batch_size % 2  # Antithetic pairs need an even batch
+        result = simulate_matches(player_1, player_2, batch_size, rng = numpy_stream(seed, batch), antithetic = antithetic)
+        won = (result.winners == 0).astype(float)
+        if antithetic:
+            half = batch_size // 2
+            values = (won[:half] + won[half:]) / 2
+        else:
+            values = won
+        count += len(values)
+        total += values.sum()
+        squares += (values * values).sum()
+        wins += int(won.sum())
+        samples += batch_size
+        batch += 1
+        batch_size = min(2 * batch_size, max(max_samples - samples, 1))
+
+        mean = total / count
+        variance = max(squares / count - mean * mean, 0.0) * count / max(count - 1, 1)
+        if variance > 0:
+            spread = z * math.sqrt(variance / count)
+            low, high = mean - spread, mean + spread
+        else:
+            low, high = wilson_interval(wins, samples, z)  # Every match had the same winner
+
+        if high - low <= target_width or samples >= max_samples:
+            return Estimate(mean, max(low, 0.0), min(high, 1.0), samples)
@@ -0,0 +1,270 @@
+'''
+Benchmarks for the match engine, the scoring state machine and the player files.
+
+Run "python benchmark.py --output results.json" and compare two runs with
+"python benchmark.py --compare old.json" to catch slowdowns between commits.
+'''
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from match import Match, simulate_match
+from player import Player
+from scoring import CLASSIC, TIEBREAK_SETS
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+def best_time(function, repeat=5):
+    """
+    Return the fastest of several runs of a function in seconds.
+
+    The fastest run is the one least disturbed by the rest of the machine.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def write_roster(filename, size, seed=0):
+    """Write a players file with size random players in the format of 'players.txt'."""
+    rng = random.Random(seed)
+    lines = []
+    for index in range(size):
+        lines.append(f"Player {index}\n{rng.uniform(0.4, 0.8):.3f}\n{rng.randint(0, 50)}\n{rng.randint(0, 50)}")
+    with open(filename, "w") as file:
+        file.write("\n".join(lines))
+
+def bench_add_points(count=200000):
+    """Points per second through the scoring state machine alone."""
+    match = Match([Player("A", 0.6), Player("B", 0.6)])
+    rng = random.Random(0)
+    winners = [rng.randint(0, 1) for _ in range(count)]
+
+    def run():
+        for winner in winners:
+            match.add_points(winner)
+            if match.game_winner() is not None:
+                match.reset_points()
+
+    return {"seconds": best_time(run), "count": count, "unit": "points"}
+
+def bench_simulate_point(count=100000):
+    """Points per second through Match.simulate_point, rolls included."""
+    def run():
+        match = Match([Player("A", 0.6), Player("B", 0.58)], random.Random(0))
+        for _ in range(count):
+            match.simulate_point(match.server())
+            winner = match.game_winner()
+            if winner is not None:
+                match.reset_points()
+
+    return {"seconds": best_time(run), "count": count, "unit": "points"}
+
+def bench_matches(count=2000):
+    """Full matches per second through simulate_match."""
+    player_1, player_2 = Player("A", 0.6), Player("B", 0.58)
+
+    def run():
+        for seed in range(count):
+            simulate_match(player_1, player_2, seed)
+
+    return {"seconds": best_time(run), "count": count, "unit": "matches"}
+
+def bench_vectorized(count=100000, match_format=CLASSIC):
+    """Full matches per second through the NumPy batch engine, if NumPy is installed."""
+    try:
+        from vectorized import simulate_matches
+    except ImportError:
+        return {"skipped": "NumPy is not installed"}
+    player_1, player_2 = Player("A", 0.6), Player("B", 0.58)
+    seconds = best_time(lambda: simulate_matches(player_1, player_2, count, seed = 0, match_format = match_format),
+                        repeat = 3)
+    return {"seconds": seconds, "count": count, "unit": "matches"}
+
+def bench_import_players(size):
+    """Loading a roster of the given size with tennis_game_main.import_players."""
+    from tennis_game_main import import_players
+    seconds = best_time(import_players, repeat = 3)  # Reads 'players.txt' in the working directory
+    return {"seconds": seconds, "count": size, "unit": "players"}
+
+def bench_update_stats(size):
+    """Saving one player's result to a roster of the given size."""
+    player = Player(f"Player {size // 2}", 0.6)
+    seconds = best_time(lambda: player.update_stats_in_file("players.txt"), repeat = 3)
+    return {"seconds": seconds, "count": 1, "unit": "writes"}
+
+def bench_startup_imports():
+    """
+    Import time of everything the window needs, measured like python -X importtime.
+
+    The five slowest modules, by time including their own imports, are listed under "slowest".
+    """
+    output = subprocess.run([sys.executable, "-X", "importtime", "-c", "import tennis_game_main, ui"],
+                            capture_output = True, text = True, cwd = HERE)
+    total = 0
+    modules = []
+    for line in output.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules.append((int(cumulative), name.strip()))
+        if name.strip() in ("tennis_game_main", "ui"):
+            total += int(cumulative)
+    slowest = [name for _, name in sorted(modules, reverse = True)[:5]]
+    return {"seconds": total / 10 ** 6, "count": 1, "unit": "startups", "slowest": slowest}
+
+def bench_startup_window(size):
+    """Time from starting tennis_game_main.py until its window is shown, with a roster of the given size."""
+    error = display_error()
+    if error:
+        return {"skipped": error}
+    command = [sys.executable, os.path.join(HERE, "tennis_game_main.py"), "--exit-after-startup"]
+    subprocess.run(command, capture_output = True)  # The first start migrates 'players.txt' to the store
+    seconds = best_time(lambda: subprocess.run(command, capture_output = True), repeat = 3)
+    return {"seconds": seconds, "count": 1, "unit": "startups"}
+
+def display_error():
+    """Return why Tk windows can't be opened here, or None if they can."""
+    try:
+        import tkinter as tk
+        tk.Tk().destroy()
+    except Exception as error:  # No tkinter or no display
+        return str(error)
+    return None
+
+def bench_player_labels(size):
+    """Drawing the leaderboard page in MenuUI.create_player_labels, if there is a display."""
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception as error:  # No tkinter or no display
+        return {"skipped": str(error)}
+    try:
+        import ui
+        from player import iter_players_file
+        root.withdraw()
+        menu = ui.MenuUI(root, list(iter_players_file("players.txt")))
+        seconds = best_time(lambda: (menu.create_player_labels(), root.update_idletasks()), repeat = 5)
+        return {"seconds": seconds, "count": 1, "unit": "renders"}
+    finally:
+        root.destroy()
+
+def run_benchmarks(sizes=(1000, 10000, 100000), quick=False):
+    """
+    Run every benchmark.
+
+    Parameters:
+    sizes (tuple, optional): Roster sizes for the player file benchmarks.
+    quick (bool, optional): Use a tenth of the work for a fast smoke run.
+
+    Returns:
+    dict: Benchmark name -> result. Every result has seconds, count and unit, or skipped.
+    """
+    scale = 10 if quick else 1
+    results = {
+        "startup_imports": bench_startup_imports(),
+        "add_points": bench_add_points(200000 // scale),
+        "simulate_point": bench_simulate_point(100000 // scale),
+        "simulate_match": bench_matches(2000 // scale),
+        "vectorized_matches": bench_vectorized(100000 // scale),
+        "vectorized_tiebreak_matches": bench_vectorized(100000 // scale, TIEBREAK_SETS),
+    }
+
+    # The player file benchmarks run on generated rosters in a scratch directory
+    directory = os.getcwd()
+    with tempfile.TemporaryDirectory() as scratch:
+        os.chdir(scratch)
+        try:
+            for size in sizes:
+                write_roster("players.txt", size)
+                results[f"import_players_{size}"] = bench_import_players(size)
+                results[f"update_stats_in_file_{size}"] = bench_update_stats(size)
+                results[f"create_player_labels_{size}"] = bench_player_labels(size)
+                results[f"startup_window_{size}"] = bench_startup_window(size)
+                if os.path.exists("players.db"):
+                    os.remove("players.db")  # The next size starts from its own roster
+        finally:
+            os.chdir(directory)
+
+    for result in results.values():
+        if "seconds" in result:
+            result["per_second"] = result["count"] / result["seconds"] if result["seconds"] > 0 else None
+    return results
+
+def current_commit():
+    """Return the git commit being measured, or None outside a repository."""
+    try:
+        output = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output = True, text = True,
+                                cwd = os.path.dirname(os.path.abspath(__file__)))
+        return output.stdout.strip() or None
+    except OSError:
+        return None
+
+def compare(results, baseline, threshold):
+    """
+    Return the benchmarks that are more than threshold slower than in the baseline.
+
+    Parameters:
+    results (dict): The new results.
+    baseline (dict): Results from an earlier run.
+    threshold (float): Allowed slowdown, 0.2 means 20 %.
+
+    Returns:
+    list: (name, old seconds, new seconds) for every regression.
+    """
+    regressions = []
+    for name, result in results.items():
+        old = baseline.get(name, {})
+        if "seconds" in result and "seconds" in old and result["seconds"] > old["seconds"] * (1 + threshold):
+            regressions.append((name, old["seconds"], result["seconds"]))
+    return regressions
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description = "Benchmark the tennis simulator.")
+    parser.add_argument("--sizes", type = int, nargs = "+", default = [1000, 10000, 100000],
+                        help = "roster sizes for the player file benchmarks")
+    parser.add_argument("--quick", action = "store_true", help = "do a tenth of the work")
+    parser.add_argument("--output", help = "write the results to this JSON file")
+    parser.add_argument("--compare", help = "JSON file from an earlier run to compare against")
+    parser.add_argument("--threshold", type = float, default = 0.2,
+                        help = "slowdown that counts as a regression (default 0.2 = 20%%)")
+    args = parser.parse_args(arguments)
+
+    results = run_benchmarks(tuple(args.sizes), args.quick)
+    for name, result in results.items():
+        if "skipped" in result:
+            print(f"{name:<32}skipped: {result['skipped']}")
+        else:
+            print(f"{name:<32}{result['seconds'] * 1000:10.2f} ms {result['per_second']:14,.0f} {result['unit']}/s")
+
+    if args.output:
+        report = {
+            "commit": current_commit(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "results": results,
+        }
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent = 2)
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for name, old, new in regressions:
+            print(f"REGRESSION {name}: {old * 1000:.2f} ms -> {new * 1000:.2f} ms")
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
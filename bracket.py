@@ -0,0 +1,199 @@
+'''
+Single-elimination draws and forecasts of how far every player gets.
+'''
+
+from match import simulate_match
+from streams import new_root_seed, python_stream, stream_seed
+from exact import match_win_probability
+
+def seed_positions(size):
+    """
+    Return the seed placed at each position of a standard draw.
+
+    Seeds 1 and 2 can only meet in the final, seeds 1 to 4 in the semifinals and so on.
+
+    Parameters:
+    size (int): Number of places in the draw, a power of two.
+
+    Returns:
+    list: The seed (starting at 1) at every position.
+    """
+    positions = [1]
+    while len(positions) < size:
+        count = len(positions) * 2
+        positions = [seed for top in positions for seed in (top, count + 1 - top)]
+    return positions
+
+def seeded_draw(players):
+    """
+    Build a seeded draw from the players, best win rate first.
+
+    The draw is padded with byes (None) up to the next power of two, and the byes
+    go to the top seeds.
+
+    Parameters:
+    players (list): The players taking part.
+
+    Returns:
+    list: The players and byes in draw order. Neighbours 2i and 2i + 1 meet in round one.
+    """
+    seeds = sorted(players, key = lambda player: player.win_rate, reverse = True)
+    size = 1
+    while size < len(seeds):
+        size *= 2
+    return [seeds[seed - 1] if seed <= len(seeds) else None for seed in seed_positions(size)]
+
+class BracketForecast:
+    '''How likely every player in a draw is to reach each round.'''
+    def __init__(self, draw, reach):
+        """
+        Initialize a new BracketForecast instance.
+
+        Parameters:
+        draw (list): The players and byes in draw order.
+        reach (list): For every draw position, the probability of reaching each round.
+        The first value is always 1 and the last is the chance of winning the title.
+        """
+        self.draw = draw
+        self.reach = reach
+
+    def title_probabilities(self):
+        """
+        Return each player's chance of winning the tournament.
+
+        Returns:
+        dict: Maps player name to probability, most likely winner first.
+        """
+        odds = {player.name: reach[-1] for player, reach in zip(self.draw, self.reach) if player is not None}
+        return dict(sorted(odds.items(), key = lambda item: item[1], reverse = True))
+
+    def __str__(self):
+        rows = []
+        for player, reach in sorted(zip(self.draw, self.reach), key = lambda row: row[1][-1], reverse = True):
+            if player is not None:
+                rounds = " ".join(f"{value:7.2%}" for value in reach[1:])
+                rows.append(f"{player.name:<25}{rounds}")
+        return "\n".join(rows)
+
+def exact_forecast(draw, win_probability=match_win_probability):
+    """
+    Propagate every pairing's match-win probability through the rounds of a draw.
+
+    In each round a player's chance to go through is their chance to be there times
+    the chance to beat whoever comes out of the neighbouring half of their block.
+    Every pair of players is looked at once, so the work is O(n ** 2).
+
+    Parameters:
+    draw (list): The players and byes in draw order, as made by seeded_draw.
+    win_probability (function, optional): Gives the chance that the first player beats the second.
+
+    Returns:
+    BracketForecast: The chance of every player reaching each round.
+    """
+    size = len(draw)
+    reach = [[1.0] if player is not None else [0.0] for player in draw]
+    chances = {}  # (i, j) with i < j -> chance that draw[i] beats draw[j]
+    block = 1
+    round_index = 0
+    while block < size:
+        for i in range(size):
+            if draw[i] is None:
+                reach[i].append(0.0)
+                continue
+
+            # The opponents come from the other half of the block of size 2 * block
+            start = (i // block ^ 1) * block
+            opponents = [j for j in range(start, start + block) if draw[j] is not None]
+            if not opponents:
+                reach[i].append(reach[i][round_index])  # A bye
+                continue
+            beat = 0.0
+            for j in opponents:
+                # The player earlier in the draw serves first, as in play_draw
+                pair = (min(i, j), max(i, j))
+                if pair not in chances:
+                    chances[pair] = win_probability(draw[pair[0]], draw[pair[1]])
+                chance = chances[pair] if i < j else 1 - chances[pair]
+                beat += reach[j][round_index] * chance
+            reach[i].append(reach[i][round_index] * beat)
+        block *= 2
+        round_index += 1
+    return BracketForecast(draw, reach)
+
+def play_draw(draw, seed=None):
+    """
+    Play a draw once, match by match.
+
+    Parameters:
+    draw (list): The players and byes in draw order.
+    seed (int, optional): Seed for the matches. Match k of the draw uses stream k of it.
+
+    Returns:
+    list: For every draw position, the number of rounds the player won.
+    """
+    if seed is None:
+        seed = new_root_seed()
+    match_index = 0
+    wins = [0] * len(draw)
+    alive = list(range(len(draw)))
+    while len(alive) > 1:
+        next_round = []
+        for first, second in zip(alive[::2], alive[1::2]):
+            if draw[second] is None:
+                winner = first
+            elif draw[first] is None:
+                winner = second
+            else:
+                result = simulate_match(draw[first], draw[second], rng = python_stream(seed, match_index))
+                match_index += 1
+                winner = (first, second)[result.winner]
+            wins[winner] += 1
+            next_round.append(winner)
+        alive = next_round
+    return wins
+
+def simulate_forecast(draw, n=1000, seed=None, checkpoint=None, checkpoint_interval=5.0):
+    """
+    Estimate how far every player gets by playing the draw n times.
+
+    Parameters:
+    draw (list): The players and byes in draw order.
+    n (int, optional): Number of tournaments to play.
+    seed (int, optional): Seed for the tournaments. Tournament t uses stream t of it.
+    checkpoint (str, optional): File to save progress to every checkpoint_interval
+    seconds. An interrupted run with the same draw, n and seed carries on from it,
+    with the same result. The caller removes it once the forecast has been used.
+    checkpoint_interval (float, optional): Seconds between checkpoints.
+
+    Returns:
+    BracketForecast: The share of tournaments in which each player reached each round.
+
+    Raises:
+    ValueError: If the checkpoint belongs to a different forecast.
+    """
+    if seed is None:
+        seed = new_root_seed()
+    rounds = len(draw).bit_length() - 1
+    counts = [[0] * (rounds + 1) for _ in draw]
+    done = 0
+    saver = None
+    if checkpoint is not None:
+        from checkpoint import Checkpoint, fingerprint
+        players = sum(player is not None for player in draw)
+        saver = Checkpoint(checkpoint, "forecast", {"seed": seed, "n": n, "players": players,
+                                                    "draw": fingerprint(draw)}, checkpoint_interval)
+        saved = saver.load()
+        if saved is not None:
+            done, counts = saved[0], saved[1]["counts"]
+
+    # Saved only between tournaments, when the counts hold whole tournaments
+    for tournament in range(done, n):
+        for position, wins in enumerate(play_draw(draw, stream_seed(seed, tournament))):
+            if draw[position] is not None:
+                for round_index in range(wins + 1):
+                    counts[position][round_index] += 1
+        if saver is not None and saver.due():
+            saver.save(tournament + 1, {"counts": counts})
+    if saver is not None:
+        saver.save(n, {"counts": counts})
+    return BracketForecast(draw, [[count / n for count in row] for row in counts])
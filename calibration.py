@@ -0,0 +1,187 @@
+'''
+Fit every player's chance_to_win to recorded match results.
+
+Under the roll model in Match.calculate_point the chance that one player beats
+another only depends on the ratio of their chances. With theta = log(chance)
+it is a fixed curve f(theta_first - theta_second), which is worked out exactly
+once on a grid by exact.py. The fit maximizes the likelihood of the results over
+all thetas at once with NumPy, using Fisher scoring: every step is a handful of
+array operations over all matches and all players, so rosters of tens of
+thousands of players take seconds.
+'''
+
+import numpy as np
+from exact import match_win_probability_from_chances
+from scoring import CLASSIC
+
+CURVE_RANGE = 0.5     # Log-ratios tabulated on each side of 0
+CURVE_POINTS = 1001
+SMALLEST = 1e-12      # Below this f or 1 - f has lost its precision in floating point
+curves = {}  # MatchFormat -> (grid, log-odds of f)
+
+def match_win_curve(match_format=CLASSIC):
+    """
+    Return the log-odds of winning a match as a function of the log-ratio of the chances.
+
+    The curve is tabulated where it can be computed accurately. Matches are all but
+    decided long before the ends of the grid, so past them the log-odds continue in
+    a straight line.
+
+    Returns:
+    tuple: The evenly spaced grid of log-ratios and the log-odds of the first player
+    on it, as arrays.
+    """
+    if match_format not in curves:
+        grid = np.linspace(-CURVE_RANGE, CURVE_RANGE, CURVE_POINTS)
+        values = np.array([match_win_probability_from_chances(float(np.exp(d)), 1.0, match_format) for d in grid])
+        accurate = np.minimum(values, 1 - values) > SMALLEST
+        grid, values = grid[accurate], values[accurate]
+        curves[match_format] = (grid, np.log(values) - np.log1p(-values))
+    return curves[match_format]
+
+def season_results(season):
+    """
+    Return the results of a simulated season as arrays.
+
+    Parameters:
+    season (SeasonResult): The season, for example from season.simulate_season.
+
+    Returns:
+    tuple: The index of the player serving first in every match, the index of the
+    other player and whether the first player won.
+    """
+    fixtures = np.array(season.fixtures, dtype = np.int64).reshape(-1, 2)
+    return fixtures[:, 0], fixtures[:, 1], np.array(season.winners) == 0
+
+def fit_chances(chances, first, second, first_won, match_format=CLASSIC, prior_sd=0.25,
+                iterations=50, tolerance=1e-4, cg_steps=10, largest_step=0.1):
+    """
+    Find the chance_to_win values that make the results most likely.
+
+    Only ratios of chances affect results, so each player's log chance gets a normal
+    prior around its current value. This keeps players with few matches or only
+    wins from running off, and the geometric mean of the roster is kept as it was.
+
+    Parameters:
+    chances (array): Every player's current chance_to_win.
+    first (array): The index of the player serving first in every match.
+    second (array): The index of the other player in every match.
+    first_won (array): True where the first player won.
+    match_format (MatchFormat, optional): The rules the matches were played with.
+    prior_sd (float, optional): Standard deviation of the prior on log chance.
+    iterations (int, optional): The most Fisher scoring steps taken.
+    tolerance (float, optional): Stop once no log chance moves more than this.
+    cg_steps (int, optional): Conjugate gradient steps spent on each scoring step.
+    largest_step (float, optional): The most a log chance moves in one scoring step.
+
+    Returns:
+    ndarray: The fitted chances, clipped to [0.01, 0.99].
+    """
+    grid, curve = match_win_curve(match_format)
+    spacing = grid[1] - grid[0]
+    chords = np.diff(curve) / spacing
+    start = np.log(np.clip(np.asarray(chances, dtype = float), 0.01, 0.99))
+    players = len(start)
+
+    # Matches between the same players in the same order are added up
+    keys, pairing, counts = np.unique(np.asarray(first, dtype = np.int64) * players + second,
+                                      return_inverse = True, return_counts = True)
+    wins = np.bincount(pairing.ravel(), np.asarray(first_won, dtype = float), len(keys))
+    first, second = np.divmod(keys, players)
+    prior = 1 / prior_sd ** 2
+
+    def spread(values):
+        """Add up per pairing values for the first player, minus for the second."""
+        return np.bincount(first, values, players) - np.bincount(second, values, players)
+
+    def log_odds(theta):
+        """Return the log-odds that the first player wins and its slope, for every pairing."""
+        difference = theta[first] - theta[second]
+        segment = np.clip(((difference - grid[0]) / spacing).astype(np.intp), 0, len(chords) - 1)
+        slope = chords[segment]
+        return curve[segment] + slope * (difference - grid[segment]), slope
+
+    def log_likelihood(theta, odds):
+        """The log-likelihood of the results plus the log prior."""
+        return wins @ odds - counts @ np.logaddexp(0, odds) - prior / 2 * ((theta - start) ** 2).sum()
+
+    theta = start.copy()
+    odds, derivative = log_odds(theta)
+    current = log_likelihood(theta, odds)
+    for _ in range(iterations):
+        # Score and Fisher information of every pairing
+        probability = 0.5 * (1 + np.tanh(odds / 2))
+        gradient = spread((wins - counts * probability) * derivative) - prior * (theta - start)
+        information = counts * probability * (1 - probability) * derivative ** 2
+        diagonal = np.bincount(first, information, players) + np.bincount(second, information, players) + prior
+
+        # Solve information @ step = gradient by conjugate gradients, preconditioned by the
+        # diagonal. The matrix is never built: multiplying by it is two bincounts
+        step = np.zeros(players)
+        residual = gradient
+        preconditioned = residual / diagonal
+        direction = preconditioned
+        product = residual @ preconditioned
+        for _ in range(cg_steps):
+            applied = spread(information * (direction[first] - direction[second])) + prior * direction
+            length = product / (direction @ applied)
+            step = step + length * direction
+            residual = residual - length * applied
+            if np.abs(residual).max() < tolerance * prior:
+                break
+            preconditioned = residual / diagonal
+            product, previous = residual @ preconditioned, product
+            direction = preconditioned + product / previous * direction
+
+        # The match curve is steep, so far from the optimum a full step can overshoot.
+        # Each player moves at most largest_step, halved until the likelihood goes up
+        step = np.clip(step, -largest_step, largest_step)
+        for _ in range(30):
+            trial = theta + step
+            trial += start.mean() - trial.mean()  # Only ratios are identified, keep the scale
+            trial_odds, trial_derivative = log_odds(trial)
+            likelihood = log_likelihood(trial, trial_odds)
+            if likelihood >= current:
+                break
+            step = step / 2
+        else:
+            break
+        theta, odds, derivative, current = trial, trial_odds, trial_derivative, likelihood
+        if np.abs(step).max() < tolerance:
+            break
+    return np.clip(np.exp(theta), 0.01, 0.99)
+
+def fit_season(season, match_format=CLASSIC, prior_sd=0.25):
+    """
+    Work out new chance_to_win values for the players in a season, without changing them.
+
+    Parameters:
+    season (SeasonResult): The season that was played.
+    match_format (MatchFormat, optional): The rules the matches were played with.
+    prior_sd (float, optional): Standard deviation of the prior on log chance.
+
+    Returns:
+    list: The fitted chance of every player, rounded to 4 decimals, in the order of season.players.
+    """
+    chances = [player.chance_to_win for player in season.players]
+    fitted = fit_chances(chances, *season_results(season), match_format, prior_sd)
+    return [round(float(chance), 4) for chance in fitted]
+
+def calibrate_season(season, store=None, match_format=CLASSIC, prior_sd=0.25):
+    """
+    Refit the chance_to_win of the players in a season from its results.
+
+    Parameters:
+    season (SeasonResult): The season that was played.
+    store (PlayerStore, optional): Where the new chances are saved.
+    match_format (MatchFormat, optional): The rules the matches were played with.
+    prior_sd (float, optional): Standard deviation of the prior on log chance.
+
+    Returns:
+    list: The players, with their chance_to_win updated.
+    """
+    for player, chance in zip(season.players, fit_season(season, match_format, prior_sd)):
+        player.chance_to_win = chance
+    if store is not None:
+        store.update_chances(season.players)
+    return season.players
@@ -0,0 +1,118 @@
+'''
+Checkpoints for long simulations, so an interrupted run carries on where it stopped.
+
+Every simulation here plays match k from stream k of its seed (see streams.py),
+so the position of every random stream is simply how many matches are done. A
+checkpoint holds the settings of the run, that count and whatever has been
+added up so far. It is a line of JSON followed by an optional compressed
+payload, written next to the target and renamed over it, so a crash while
+saving leaves the previous checkpoint in place.
+'''
+
+import hashlib
+import json
+import os
+import time
+import uuid
+import zlib
+
+VERSION = 1
+
+def fingerprint(players):
+    """
+    Return a short hash of the names and chances of some players.
+
+    A checkpoint only fits the players it was written for; if a chance_to_win
+    changed in between, resuming would give different results.
+
+    Parameters:
+    players (list): Player instances, or None for a bye.
+    """
+    digest = hashlib.blake2b(digest_size = 8)
+    for player in players:
+        line = "-" if player is None else f"{player.name}\t{player.chance_to_win!r}"
+        digest.update(line.encode() + b"\n")
+    return digest.hexdigest()
+
+def read_header(filename):
+    """
+    Read the JSON part of a checkpoint.
+
+    Returns:
+    dict: The kind, run id, settings, number of completed steps and state of the run.
+    """
+    with open(filename, "rb") as file:
+        return json.loads(file.readline())
+
+class Checkpoint:
+    '''The progress of one run, saved to a file at most every interval seconds.'''
+    def __init__(self, filename, kind, settings, interval=5.0):
+        """
+        Initialize a new Checkpoint instance.
+
+        Parameters:
+        filename (str): Where the checkpoint is kept.
+        kind (str): What is being run, for example "season".
+        settings (dict): Everything the results depend on, as JSON values.
+        interval (float, optional): Seconds between saves. At most this much work is
+        lost when the run is interrupted.
+        """
+        self.filename = filename
+        self.kind = kind
+        self.settings = settings
+        self.interval = interval
+        self.run = uuid.uuid4().hex  # Names this run until it is done, across resumes
+        self.last_saved = time.monotonic()
+
+    def load(self):
+        """
+        Read the progress saved by an earlier run with the same settings.
+
+        Returns:
+        tuple or None: The number of completed steps, the state dict and the payload
+        bytes, or None if there is no checkpoint yet.
+
+        Raises:
+        ValueError: If the checkpoint belongs to a different run.
+        """
+        if not os.path.exists(self.filename):
+            return None
+        with open(self.filename, "rb") as file:
+            header = json.loads(file.readline())
+            payload = file.read()
+        if header.get("version") != VERSION or header.get("kind") != self.kind:
+            raise ValueError(f"{self.filename} is not a {self.kind} checkpoint.")
+        if header["settings"] != self.settings:
+            raise ValueError(f"{self.filename} was written for a different {self.kind}.")
+        self.run = header["run"]
+        return header["completed"], header["state"], zlib.decompress(payload) if payload else b""
+
+    def due(self):
+        """Return True once interval seconds have passed since the last save."""
+        return time.monotonic() - self.last_saved >= self.interval
+
+    def save(self, completed, state=None, payload=b""):
+        """
+        Replace the checkpoint with the current progress.
+
+        Parameters:
+        completed (int): Number of steps done, for example matches or tournaments.
+        state (dict, optional): Totals so far, as JSON values.
+        payload (bytes, optional): Bulk data, stored compressed.
+        """
+        header = {"version": VERSION, "kind": self.kind, "run": self.run, "settings": self.settings,
+                  "completed": completed, "state": state or {}}
+        temp_filename = f"{self.filename}.tmp"
+        with open(temp_filename, "wb") as file:
+            file.write(json.dumps(header).encode() + b"\n")
+            if payload:
+                file.write(zlib.compress(payload, 1))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_filename, self.filename)
+        self.last_saved = time.monotonic()
+
+    def remove(self):
+        """Delete the checkpoint once the run's results are safely saved."""
+        if os.path.exists(self.filename):
+            os.remove(self.filename)
@@ -0,0 +1,240 @@
+'''
+Exact win probabilities for the roll model in Match.calculate_point.
+
+The server wins a point when max(U, U, U) * c_server >= max(V, V) * c_receiver.
+That probability only depends on the ratio of the two chances, and the game,
+set and match probabilities follow from it without any sampling.
+'''
+
+from scoring import CLASSIC, tiebreak_server_swapped
+
+def point_win_probability(server_chance, receiver_chance):
+    """
+    Calculate the probability that the server wins a point.
+
+    The best of three rolls X has P(X <= x) = x ** 3 and the best of two rolls Y has
+    P(Y <= y) = y ** 2. With r = c_server / c_receiver the server wins with
+    probability 3 * r ** 2 / 5 when r <= 1 and 1 - 2 / (5 * r ** 3) when r >= 1.
+
+    Parameters:
+    server_chance (float): The server's chance_to_win.
+    receiver_chance (float): The receiver's chance_to_win.
+
+    Returns:
+    float: The probability that the server wins the point.
+    """
+    if receiver_chance <= 0:
+        return 1.0  # Ties go to the server, so a zero receiver never wins
+    ratio = server_chance / receiver_chance
+    if ratio <= 1:
+        return 3 * ratio ** 2 / 5
+    return 1 - 2 / (5 * ratio ** 3)
+
+def game_win_probability(p, no_ad=False):
+    """
+    Calculate the probability that the server wins a game.
+
+    Parameters:
+    p (float): The probability that the server wins each point.
+    no_ad (bool, optional): The point after deuce decides the game.
+
+    Returns:
+    float: The probability that the server holds serve.
+    """
+    q = 1 - p
+
+    # Wins to 0, 15 or 30, or reaches deuce and then wins two points in a row first
+    before_deuce = p ** 4 * (1 + 4 * q + 10 * q ** 2)
+    deuce = 20 * p ** 3 * q ** 3
+    if no_ad:
+        return before_deuce + deuce * p
+    return before_deuce + deuce * p ** 2 / (p ** 2 + q ** 2)
+
+def tied_win_probability(win_1, win_2):
+    """
+    Return the chance that player 1 is first to win two in a row of alternating
+    contests, such as points after 6-6 in a tiebreak or games after 5-5 in a set.
+
+    Parameters:
+    win_1 (float): The chance that player 1 wins the contest they start.
+    win_2 (float): The chance that player 2 wins the contest they start.
+    """
+    player_1_both = win_1 * (1 - win_2)
+    player_2_both = (1 - win_1) * win_2
+    if player_1_both + player_2_both > 0:
+        return player_1_both / (player_1_both + player_2_both)
+    return 0.5  # Both players always win their own contests, it never ends
+
+def tiebreak_win_probability(point_1, point_2):
+    """
+    Calculate the probability that player 1 wins a tiebreak they serve first in.
+
+    The tiebreak goes to 7 points with a two point lead. After the first point
+    the players serve two points each in turn, like Match.server().
+
+    Parameters:
+    point_1 (float): The probability that player 1 wins a point on their own serve.
+    point_2 (float): The probability that player 2 wins a point on their own serve.
+
+    Returns:
+    float: The probability that player 1 wins the tiebreak.
+    """
+    tied = tied_win_probability(point_1, point_2)
+    memo = {}
+
+    def win_from(points_1, points_2):
+        if points_1 >= 7 and points_1 - points_2 >= 2:
+            return 1.0
+        if points_2 >= 7 and points_2 - points_1 >= 2:
+            return 0.0
+        if points_1 == points_2 == 6:
+            return tied  # Every two points from here are one serve each
+        if (points_1, points_2) not in memo:
+            if tiebreak_server_swapped(points_1 + points_2):
+                player_1_wins = 1 - point_2
+            else:
+                player_1_wins = point_1
+            memo[(points_1, points_2)] = (
+                player_1_wins * win_from(points_1 + 1, points_2)
+                + (1 - player_1_wins) * win_from(points_1, points_2 + 1)
+            )
+        return memo[(points_1, points_2)]
+
+    return win_from(0, 0)
+
+def set_win_probability(hold_1, hold_2, games=(0, 0), tiebreak=None):
+    """
+    Calculate the probability that player 1 wins a set.
+
+    Player 1 serves when an even number of games has been played in the set, just
+    like in Match, and a set is won with six games and a two game lead.
+
+    Parameters:
+    hold_1 (float): The probability that player 1 wins a game on their own serve.
+    hold_2 (float): The probability that player 2 wins a game on their own serve.
+    games (tuple, optional): The games score to start from. Defaults to (0, 0).
+    tiebreak (float, optional): The probability that player 1 wins a tiebreak at 6-6.
+    Defaults to an advantage set without tiebreak.
+
+    Returns:
+    float: The probability that player 1 wins the set.
+    """
+    # Without a tiebreak, from a tied score of 5-5 or more player 1 serves next and
+    # the set is decided once one player wins two games in a row
+    tied = tied_win_probability(hold_1, hold_2)
+
+    memo = {}
+
+    def win_from(games_1, games_2):
+        if games_1 >= 6 and games_1 - games_2 >= 2:
+            return 1.0
+        if games_2 >= 6 and games_2 - games_1 >= 2:
+            return 0.0
+        if tiebreak is not None:
+            if games_1 == games_2 == 6:
+                return tiebreak
+            if games_1 == 7 or games_2 == 7:
+                return 1.0 if games_1 == 7 else 0.0
+        elif games_1 == games_2 and games_1 >= 5:
+            return tied
+        if games_1 > 6 or games_2 > 6:
+            return win_from(games_1 - 1, games_2 - 1)  # Same situation as one game earlier
+        if (games_1, games_2) not in memo:
+            if (games_1 + games_2) % 2 == 0:
+                player_1_wins = hold_1
+            else:
+                player_1_wins = 1 - hold_2
+            memo[(games_1, games_2)] = (
+                player_1_wins * win_from(games_1 + 1, games_2)
+                + (1 - player_1_wins) * win_from(games_1, games_2 + 1)
+            )
+        return memo[(games_1, games_2)]
+
+    return win_from(*games)
+
+def match_win_probability_from_sets(s, sets=(0, 0), sets_to_win=2):
+    """
+    Calculate the probability that player 1 wins a match.
+
+    Parameters:
+    s (float): The probability that player 1 wins each set.
+    sets (tuple, optional): The sets won by each player so far. Defaults to (0, 0).
+    sets_to_win (int, optional): Sets needed to win, 2 in a best of three. Defaults to 2.
+
+    Returns:
+    float: The probability that player 1 wins the match.
+    """
+    sets_1, sets_2 = sets
+    if sets_1 >= sets_to_win:
+        return 1.0
+    if sets_2 >= sets_to_win:
+        return 0.0
+    return (
+        s * match_win_probability_from_sets(s, (sets_1 + 1, sets_2), sets_to_win)
+        + (1 - s) * match_win_probability_from_sets(s, (sets_1, sets_2 + 1), sets_to_win)
+    )
+
+class MatchProbabilities:
+    '''Exact point, game, set and match win probabilities for a pairing.'''
+    def __init__(self, player_1, player_2, match_format=CLASSIC):
+        """
+        Initialize a new MatchProbabilities instance.
+
+        Parameters:
+        player_1 (Player): The first player, who serves first in every set.
+        player_2 (Player): The second player.
+        match_format (MatchFormat, optional): The rules, see scoring.py. Defaults to best of three advantage sets.
+        """
+        chance_1 = player_1.chance_to_win
+        chance_2 = player_2.chance_to_win
+
+        # Probabilities that each player wins a point and a game on their own serve
+        self.point_1 = point_win_probability(chance_1, chance_2)
+        self.point_2 = point_win_probability(chance_2, chance_1)
+        self.hold_1 = game_win_probability(self.point_1, match_format.no_ad)
+        self.hold_2 = game_win_probability(self.point_2, match_format.no_ad)
+        self.tiebreak_1 = tiebreak_win_probability(self.point_1, self.point_2) if match_format.tiebreak else None
+
+        # Probabilities that player 1 wins a set and the match
+        self.set_1 = set_win_probability(self.hold_1, self.hold_2, tiebreak = self.tiebreak_1)
+        self.match_1 = match_win_probability_from_sets(self.set_1, sets_to_win = match_format.sets_to_win)
+
+    def __str__(self):
+        return (
+            f"Point: {self.point_1:.4f}/{self.point_2:.4f} | Hold: {self.hold_1:.4f}/{self.hold_2:.4f} "
+            f"| Set: {self.set_1:.4f} | Match: {self.match_1:.4f}"
+        )
+
+def match_win_probability(player_1, player_2, match_format=CLASSIC):
+    """
+    Calculate the exact probability that player 1 wins a match.
+
+    Parameters:
+    player_1 (Player): The first player, who serves first in every set.
+    player_2 (Player): The second player.
+    match_format (MatchFormat, optional): The rules, see scoring.py. Defaults to best of three advantage sets.
+
+    Returns:
+    float: The probability that player 1 wins the match.
+    """
+    return MatchProbabilities(player_1, player_2, match_format).match_1
+
+def match_win_probability_from_chances(chance_1, chance_2, match_format=CLASSIC):
+    """
+    Calculate the exact match-win probability straight from two chance_to_win values.
+
+    Parameters:
+    chance_1 (float): The chance_to_win of the player who serves first in every set.
+    chance_2 (float): The chance_to_win of the other player.
+    match_format (MatchFormat, optional): The rules, see scoring.py. Defaults to best of three advantage sets.
+
+    Returns:
+    float: The probability that the first player wins the match.
+    """
+    point_1 = point_win_probability(chance_1, chance_2)
+    point_2 = point_win_probability(chance_2, chance_1)
+    hold_1 = game_win_probability(point_1, match_format.no_ad)
+    hold_2 = game_win_probability(point_2, match_format.no_ad)
+    tiebreak = tiebreak_win_probability(point_1, point_2) if match_format.tiebreak else None
+    return match_win_probability_from_sets(set_win_probability(hold_1, hold_2, tiebreak = tiebreak),
+                                           sets_to_win = match_format.sets_to_win)
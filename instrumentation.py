@@ -0,0 +1,201 @@
+'''
+Opt-in counters, latency histograms and profiling for the simulator.
+
+Nothing is measured until enable() is called. It wraps the hot methods
+(Match.calculate_point, GUI.update_display, Player.update_stats_in_file, ...)
+with counting and timing versions, and disable() puts the originals back,
+so the code runs exactly as before when instrumentation is off.
+
+    import instrumentation
+    instrumentation.enable()
+    ...
+    print(instrumentation.report())
+'''
+
+import cProfile
+import functools
+import pstats
+import sys
+import time
+from contextlib import contextmanager
+
+class Histogram:
+    '''Latencies in power-of-two nanosecond buckets, cheap enough to record every call.'''
+    def __init__(self):
+        self.buckets = [0] * 64  # Bucket i holds latencies below 2 ** i nanoseconds
+        self.count = 0
+        self.total = 0  # Nanoseconds
+        self.largest = 0
+
+    def add(self, nanoseconds):
+        """Record one latency in nanoseconds."""
+        self.buckets[min(nanoseconds.bit_length(), 63)] += 1
+        self.count += 1
+        self.total += nanoseconds
+        if nanoseconds > self.largest:
+            self.largest = nanoseconds
+
+    def percentile(self, fraction):
+        """
+        Return an upper bound on the given percentile in nanoseconds.
+
+        Parameters:
+        fraction (float): For example 0.99 for the 99th percentile.
+        """
+        if self.count == 0:
+            return 0
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= fraction * self.count:
+                return min(2 ** index, self.largest)
+        return self.largest
+
+    def summary(self):
+        """Return the count and the mean, median, 99th percentile and largest latency in microseconds."""
+        mean = self.total / self.count if self.count else 0
+        return {
+            "count": self.count,
+            "mean_us": mean / 1000,
+            "p50_us": self.percentile(0.5) / 1000,
+            "p99_us": self.percentile(0.99) / 1000,
+            "max_us": self.largest / 1000,
+        }
+
+counters = {}    # Name -> number of events
+histograms = {}  # Name -> Histogram
+originals = []   # (owner, attribute, original) of every wrapped function, while enabled
+
+def count(name, amount=1):
+    """Add to a counter."""
+    counters[name] = counters.get(name, 0) + amount
+
+def timed(name, function):
+    """Return a version of function that records its latency in the histogram called name."""
+    histogram = histograms.setdefault(name, Histogram())
+    clock = time.perf_counter_ns
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = clock()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            histogram.add(clock() - start)
+    return wrapper
+
+def counted(name, function):
+    """Return a version of function that adds one to the counter called name on every call."""
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        counters[name] = counters.get(name, 0) + 1
+        return function(*args, **kwargs)
+    return wrapper
+
+def count_games_and_sets(function):
+    """Wrap Match.end_game so it counts games and the sets they finish."""
+    @functools.wraps(function)
+    def wrapper(match, winner):
+        current_set = match.current_set
+        function(match, winner)
+        count("games")
+        if match.current_set != current_set:
+            count("sets")
+    return wrapper
+
+# (module, owner, attribute, wrap) for everything enable() instruments. The owner is
+# a class name or None for a module function.
+TARGETS = [
+    ("match", "Match", "record_point", lambda function: counted("points", function)),
+    ("match", "Match", "calculate_point", lambda function: timed("calculate_point", function)),
+    ("match", "Match", "end_game", count_games_and_sets),
+    ("player", None, "write_lines_atomically", lambda function: counted("file_writes", function)),
+    ("player", "Player", "update_stats_in_file", lambda function: timed("update_stats_in_file", function)),
+    ("store", "PlayerStore", "update_stats", lambda function: counted("store_writes", function)),
+    ("store", "PlayerStore", "apply_deltas", lambda function: counted("store_writes", function)),
+    ("ui", "GUI", "update_display", lambda function: counted("redraws", timed("update_display", function))),
+    ("ui", "TournamentUI", "draw", lambda function: counted("redraws", function)),
+]
+
+def enable():
+    """
+    Start counting and timing. Does nothing if instrumentation is already on.
+
+    Only modules that have already been imported are instrumented, so enabling
+    it in a headless run doesn't pull in ui and tkinter.
+    """
+    if originals:
+        return
+    for module_name, owner_name, attribute, wrap in TARGETS:
+        module = sys.modules.get(module_name)
+        if module is None:
+            continue
+        owner = getattr(module, owner_name) if owner_name else module
+        original = getattr(owner, attribute)
+        originals.append((owner, attribute, original))
+        setattr(owner, attribute, wrap(original))
+
+def disable():
+    """Stop counting and timing and restore the original functions. The numbers so far are kept."""
+    while originals:
+        owner, attribute, original = originals.pop()
+        setattr(owner, attribute, original)
+
+def is_enabled():
+    return bool(originals)
+
+def reset():
+    """Forget every counter and latency recorded so far."""
+    counters.clear()
+    for histogram in histograms.values():
+        histogram.__init__()
+
+def snapshot():
+    """
+    Return the numbers recorded so far.
+
+    Returns:
+    dict: "counters" maps names to counts and "latencies" maps names to Histogram.summary().
+    """
+    return {
+        "counters": dict(counters),
+        "latencies": {name: histogram.summary() for name, histogram in histograms.items() if histogram.count},
+    }
+
+def report():
+    """Return the numbers recorded so far as a printable table."""
+    data = snapshot()
+    rows = [f"{name:<24}{value:>12,}" for name, value in sorted(data["counters"].items())]
+    if data["latencies"]:
+        rows.append(f"{'':<24}{'calls':>12}{'mean us':>12}{'p50 us':>12}{'p99 us':>12}{'max us':>12}")
+    for name, summary in sorted(data["latencies"].items()):
+        rows.append(
+            f"{name:<24}{summary['count']:>12,}{summary['mean_us']:>12.2f}{summary['p50_us']:>12.2f}"
+            f"{summary['p99_us']:>12.2f}{summary['max_us']:>12.2f}"
+        )
+    return "\n".join(rows)
+
+@contextmanager
+def profile(filename=None, sort="cumulative", limit=25, stream=None):
+    """
+    Run the code inside the with block under cProfile.
+
+    Parameters:
+    filename (str, optional): Where to dump the raw stats, for example for snakeviz.
+    sort (str, optional): The pstats column to sort the printed table by.
+    limit (int, optional): Number of functions printed. 0 prints nothing.
+    stream (file, optional): Where the table is printed. Defaults to stderr.
+
+    Yields:
+    cProfile.Profile: The profiler, for example to look at its stats afterwards.
+    """
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        if filename:
+            profiler.dump_stats(filename)
+        if limit:
+            pstats.Stats(profiler, stream = stream or sys.stderr).sort_stats(sort).print_stats(limit)
@@ -0,0 +1,130 @@
+'''
+A leaderboard that stays sorted by win rate as results come in.
+'''
+
+import threading
+from bisect import bisect_left, insort
+import player as player_module
+
+class Leaderboard:
+    '''Players ordered by win rate, kept in sorted buckets so updates never re-sort the roster.'''
+    bucket_size = 512  # Buckets are split when they grow past twice this size
+
+    def __init__(self, players=()):
+        """
+        Initialize a new Leaderboard instance.
+
+        Parameters:
+        players (iterable, optional): Players to add straight away.
+        """
+        self.buckets = []  # Sorted lists of (-win_rate, name) keys
+        self.maxes = []    # Largest key in each bucket, used to find the right bucket
+        self.keys = {}     # Player name -> current key
+        self.players = {}  # Player name -> Player
+        self.lock = threading.Lock()
+        for player in players:
+            self.add(player)
+        player_module.result_listeners.append(self.player_changed)  # One hook for the whole roster
+
+    def close(self):
+        """Stop following results. The players stay where they are."""
+        player_module.result_listeners.remove(self.player_changed)
+
+    @staticmethod
+    def key(player):
+        """Highest win rate first, ties broken by name."""
+        return (-player.win_rate, player.name)
+
+    def add(self, player):
+        """
+        Add a player and follow their wins and losses from now on.
+
+        Parameters:
+        player (Player): The player to add.
+        """
+        with self.lock:
+            self.players[player.name] = player
+            self.insert(self.key(player))
+
+    def remove(self, player):
+        """
+        Remove a player from the leaderboard.
+
+        Parameters:
+        player (Player): The player to remove.
+        """
+        with self.lock:
+            self.delete(self.keys.pop(player.name))
+            del self.players[player.name]
+
+    def player_changed(self, player):
+        """Move a player to their new place after a win or loss. Players not on the leaderboard are ignored."""
+        with self.lock:
+            if self.players.get(player.name) is not player:
+                return
+            self.delete(self.keys[player.name])
+            self.insert(self.key(player))
+
+    def insert(self, key):
+        self.keys[key[1]] = key
+        if not self.buckets:
+            self.buckets.append([key])
+            self.maxes.append(key)
+            return
+        index = min(bisect_left(self.maxes, key), len(self.buckets) - 1)
+        bucket = self.buckets[index]
+        insort(bucket, key)
+        self.maxes[index] = bucket[-1]
+
+        # Split a bucket that has grown too large
+        if len(bucket) > 2 * self.bucket_size:
+            self.buckets.insert(index + 1, bucket[self.bucket_size:])
+            del bucket[self.bucket_size:]
+            self.maxes.insert(index, bucket[-1])
+
+    def delete(self, key):
+        index = bisect_left(self.maxes, key)
+        bucket = self.buckets[index]
+        del bucket[bisect_left(bucket, key)]
+        if bucket:
+            self.maxes[index] = bucket[-1]
+        else:
+            del self.buckets[index]
+            del self.maxes[index]
+
+    def rank(self, player):
+        """
+        Return a player's place on the leaderboard, starting at 1.
+        """
+        with self.lock:
+            key = self.keys[player.name]
+            index = bisect_left(self.maxes, key)
+            before = sum(len(bucket) for bucket in self.buckets[:index])
+            return before + bisect_left(self.buckets[index], key) + 1
+
+    def page(self, start, count):
+        """
+        Return the players on a slice of the leaderboard.
+
+        Parameters:
+        start (int): The index of the first row (0 is the best player).
+        count (int): The maximum number of rows.
+
+        Returns:
+        list: The Player instances on the page, best first.
+        """
+        rows = []
+        with self.lock:
+            for bucket in self.buckets:
+                if start >= len(bucket):
+                    start -= len(bucket)
+                    continue
+                for key in bucket[start:start + count - len(rows)]:
+                    rows.append(self.players[key[1]])
+                start = 0
+                if len(rows) == count:
+                    break
+        return rows
+
+    def __len__(self):
+        return len(self.keys)
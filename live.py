@@ -0,0 +1,218 @@
+'''
+Live match-win probabilities for every state of a match.
+
+For a pairing, the chance that player 1 wins is worked out once for every
+state of the scoring tables in scoring.py and then looked up after each point.
+The table is kept in two parts that multiply together: the chance to win the
+current game from every point score, and the chance to win the match after
+the game is won or lost from every games and sets score.
+'''
+
+from collections import OrderedDict
+from exact import point_win_probability
+from scoring import CLASSIC, tiebreak_server_swapped
+
+def solve_chain(transitions):
+    """
+    Solve an absorbing Markov chain for the value of every state.
+
+    The value of a state is the probability-weighted value of where it goes next.
+    States that can return to themselves, like deuce and advantage, are solved
+    together as a small linear system; every other state is a single sum.
+
+    Parameters:
+    transitions (dict): Maps every state to a list of (probability, target) pairs.
+    A target is another state or, for an absorbing outcome, a float value.
+
+    Returns:
+    dict: The value of every state.
+    """
+    values = {}
+
+    # Tarjan's algorithm lists strongly connected groups of states, each one after
+    # every group it can reach, so the targets of a group are solved before it
+    index = {}
+    lowlink = {}
+    stack = []
+    on_stack = set()
+    groups = []
+
+    def connect(state):
+        index[state] = lowlink[state] = len(index)
+        stack.append(state)
+        on_stack.add(state)
+        for _, target in transitions[state]:
+            if isinstance(target, float):
+                continue
+            if target not in index:
+                connect(target)
+                lowlink[state] = min(lowlink[state], lowlink[target])
+            elif target in on_stack:
+                lowlink[state] = min(lowlink[state], index[target])
+        if lowlink[state] == index[state]:
+            group = []
+            while True:
+                member = stack.pop()
+                on_stack.discard(member)
+                group.append(member)
+                if member == state:
+                    break
+            groups.append(group)
+
+    for state in transitions:
+        if state not in index:
+            connect(state)
+
+    for group in groups:
+        if len(group) == 1 and all(target != group[0] for _, target in transitions[group[0]]):
+            state = group[0]
+            values[state] = sum(probability * (target if isinstance(target, float) else values[target])
+                                for probability, target in transitions[state])
+            continue
+
+        # x_i - sum(p_ij * x_j) = sum(p_it * value_t) over the group, by Gaussian elimination
+        position = {state: i for i, state in enumerate(group)}
+        size = len(group)
+        rows = []
+        for state in group:
+            row = [0.0] * (size + 1)
+            row[position[state]] = 1.0
+            for probability, target in transitions[state]:
+                if isinstance(target, float):
+                    row[size] += probability * target
+                elif target in position:
+                    row[position[target]] -= probability
+                else:
+                    row[size] += probability * values[target]
+            rows.append(row)
+        for column in range(size):
+            pivot = max(range(column, size), key = lambda r: abs(rows[r][column]))
+            rows[column], rows[pivot] = rows[pivot], rows[column]
+            for r in range(size):
+                if r != column and rows[r][column] != 0.0:
+                    factor = rows[r][column] / rows[column][column]
+                    for c in range(column, size + 1):
+                        rows[r][c] -= factor * rows[column][c]
+        for state in group:
+            i = position[state]
+            values[state] = rows[i][size] / rows[i][i]
+    return values
+
+class LiveOdds:
+    '''The chance that player 1 wins a match from every state of it, for one pairing.'''
+    def __init__(self, chance_1, chance_2, match_format=CLASSIC):
+        """
+        Build the lookup tables for a pairing.
+
+        Parameters:
+        chance_1 (float): The chance_to_win of player 1, who serves first in every set.
+        chance_2 (float): The chance_to_win of player 2.
+        match_format (MatchFormat, optional): The rules, see scoring.py.
+        """
+        self.format = match_format
+        point_1 = point_win_probability(chance_1, chance_2)  # Player 1 wins a point on their serve
+        point_2 = point_win_probability(chance_2, chance_1)  # Player 2 wins a point on their serve
+
+        # game[server][state * 4 + game_points % 4]: chance that player 1 wins the game. The
+        # points played only matter in tiebreaks, where they decide who serves
+        point_count = len(match_format.point_next)
+        self.game = []
+        for first_server in (0, 1):
+            transitions = {}
+            for state in range(len(match_format.point_scores)):
+                tiebreak = match_format.point_is_tiebreak[state]
+                for played in range(4 if tiebreak else 1):
+                    server = first_server ^ (tiebreak and tiebreak_server_swapped(played))
+                    player_1_wins = point_1 if server == 0 else 1 - point_2
+                    following = (played + 1) % 4 if tiebreak else 0
+                    outcomes = []
+                    for winner, probability in ((0, player_1_wins), (1, 1 - player_1_wins)):
+                        target = match_format.point_next[state * 2 + winner]
+                        outcomes.append((probability, 1.0 - ~target if target < 0 else (target, following)))
+                    transitions[(state, played)] = outcomes
+            values = solve_chain(transitions)
+            table = [0.0] * (point_count * 2)
+            for (state, played), value in values.items():
+                for rest in range(4) if not match_format.point_is_tiebreak[state] else (played,):
+                    table[state * 4 + rest] = value
+            self.game.append(table)
+
+        # after[(match_state * set_states + set_state) * 2 + game_winner]: chance that player 1
+        # wins the match once the current game has gone to game_winner
+        set_states = len(match_format.set_scores)
+        self.set_states = set_states
+
+        def after_game(set_state, match_state, winner):
+            following = match_format.set_next[set_state * 2 + winner]
+            if following >= 0:
+                return (following, match_state)
+            next_match = match_format.match_next[match_state * 2 + winner]
+            if next_match < 0:
+                return 1.0 - ~next_match
+            return (match_format.set_start, next_match)
+
+        transitions = {}
+        for match_state in range(len(match_format.match_scores)):
+            for set_state, games in enumerate(match_format.set_scores):
+                if match_format.set_tiebreak_next[set_state]:
+                    start = match_format.tiebreak_start
+                else:
+                    start = match_format.game_start
+                hold = self.game[sum(games) & 1][start * 4]
+                transitions[(set_state, match_state)] = [
+                    (hold, after_game(set_state, match_state, 0)),
+                    (1 - hold, after_game(set_state, match_state, 1)),
+                ]
+        starts = solve_chain(transitions)
+        self.after = []
+        for match_state in range(len(match_format.match_scores)):
+            for set_state in range(set_states):
+                for winner in (0, 1):
+                    target = after_game(set_state, match_state, winner)
+                    self.after.append(target if isinstance(target, float) else starts[target])
+        self.start = starts[(match_format.set_start, match_format.match_start)]
+
+    def win_probability(self, match):
+        """
+        Return the chance that player 1 wins from the current state of a match.
+
+        Parameters:
+        match (Match): A match between the pairing these tables were built for.
+
+        Returns:
+        float: The probability, looked up in constant time.
+        """
+        if match.match_state < 0:
+            return 1.0 - ~match.match_state
+        after = (match.match_state * self.set_states + match.set_state) * 2
+        if match.point_state < 0:  # The game is won but not yet added to the set
+            return self.after[after + ~match.point_state]
+        server = sum(match.games) & 1
+        game = self.game[server][match.point_state * 4 + (match.game_points & 3)]
+        return game * self.after[after] + (1 - game) * self.after[after + 1]
+
+# Pairing -> LiveOdds, least recently used first
+cache = OrderedDict()
+CACHE_SIZE = 256
+
+def live_odds(player_1, player_2, match_format=CLASSIC):
+    """
+    Return the live odds tables for a pairing, built the first time they are asked for.
+
+    Parameters:
+    player_1 (Player): The player who serves first in every set.
+    player_2 (Player): The other player.
+    match_format (MatchFormat, optional): The rules, see scoring.py.
+
+    Returns:
+    LiveOdds: The tables, shared by every match with the same chances and format.
+    """
+    key = (player_1.chance_to_win, player_2.chance_to_win, match_format)
+    if key in cache:
+        cache.move_to_end(key)
+        return cache[key]
+    odds = LiveOdds(player_1.chance_to_win, player_2.chance_to_win, match_format)
+    cache[key] = odds
+    if len(cache) > CACHE_SIZE:
+        cache.popitem(last = False)
+    return odds
@@ -1,51 +1,99 @@
 import random
+import struct
+from scoring import CLASSIC, MAX_SETS, tiebreak_server_swapped
+
+# Point, set and match states, points in the game, games, games in up to MAX_SETS sets
+# and the current set packed into 30 bytes
+STATE_FORMAT = struct.Struct(f"<3bH2H{2 * MAX_SETS}HB")
+
+class MatchResult:
+    '''A compact summary of a finished match.'''
+    __slots__ = ("winner", "sets", "point_count")
+
+    def __init__(self, winner, sets, point_count):
+        """
+        Initialize a new MatchResult instance.
+
+        Parameters:
+        winner (int): Index of the player who won the match.
+        sets (list): Each player's games in the sets played.
+        point_count (int): Number of points played in the match.
+        """
+        self.winner = winner
+        self.sets = sets
+        self.point_count = point_count
+
+    def __str__(self):
+        return f"Winner: {self.winner} | Sets: {self.sets} | Points: {self.point_count}"
 
 class Match:
     '''Represents a tennis match between two players, including scoring and match outcomes.'''
-    def __init__(self, players):
+    __slots__ = ("players", "rng", "format", "point_state", "set_state", "match_state", "game_points",
+                 "games", "sets", "current_set", "point_count", "log")
+
+    def __init__(self, players, rng=None, log=None, match_format=CLASSIC):
         """
         Initialize a new Match instance.
         
         Parameters:
         players (list): A list of Player instances participating in the match.
+        rng (random.Random or numpy.random.Generator, optional): Random generator for the point rolls.
+        Defaults to the global one. See streams.py for reproducible per-match generators.
+        log (bytearray, optional): Receives one byte per point played, see record_point.
+        match_format (MatchFormat, optional): The rules, see scoring.py. Defaults to best of
+        three advantage sets.
         """
         self.players = players
-        self.points = [0, 0]  # Points for each player
+        self.rng = rng if rng is not None else random
+        self.format = match_format
+        self.point_state = match_format.game_start  # Score of the current game, see scoring.py
+        self.set_state = match_format.set_start     # Games score of the current set, as a state
+        self.match_state = match_format.match_start  # Sets score, as a state
+        self.game_points = 0  # Points played in the current game
         self.games = [0, 0]   # Games won by each player in the current set
-        self.sets = [[0, 0, 0], [0, 0, 0]]  # Each player's games in sets (3 sets total)
+        self.sets = [[0] * match_format.best_of, [0] * match_format.best_of]  # Each player's games in every set
+        self.current_set = 0  # Index of the set being played
+        self.point_count = 0  # Number of points played so far
+        self.log = log
 
     def add_points(self, player_index):
         """
-        Add points to the specified player and handle tennis scoring logic.
+        Add a point to the specified player with one lookup in the scoring table.
         
         Parameters:
         player_index (int): The index of the player to whom points are added.
         """
-
-        # Sets variables for player and other
-        other_index = 1 - player_index
-        current_points = self.points[player_index]
-        other_points = self.points[other_index]
-
-        # Code to decide what the new points should be
-        point_progression = {0: 15, 15: 30, 30: 40}
-        if current_points in point_progression:
-            self.points[player_index] = point_progression[current_points]
-        elif current_points == 40:
-            if other_points == 40:
-                self.points[player_index] = "Adv"
-            elif other_points == "Adv":
-                self.points[other_index] = 40
-            else:
-                self.points[player_index] = "Winner"
-                self.points[other_index] = "Loser"
-        elif current_points == "Adv":
-            self.points[player_index] = "Winner"
-            self.points[other_index] = "Loser"
+        self.point_state = self.format.point_next[self.point_state * 2 + player_index]
+        self.game_points += 1
 
     def reset_points(self):
-        """Reset the points for both players to 0."""
-        self.points = [0, 0]
+        """Start a new game, which is a tiebreak if the set score calls for one."""
+        if self.format.set_tiebreak_next[self.set_state]:
+            self.point_state = self.format.tiebreak_start
+        else:
+            self.point_state = self.format.game_start
+        self.game_points = 0
+
+    def point_labels(self):
+        """
+        Return the points of both players as they are shown on a scoreboard.
+
+        Returns:
+        tuple: The labels, for example (40, "Adv").
+        """
+        return self.format.point_labels(self.point_state, self.game_points)
+
+    def server(self):
+        """
+        Return the index of the player serving the next point.
+
+        Player 1 serves when an even number of games has been played in the set,
+        and in a tiebreak the players take turns every two points.
+        """
+        server = sum(self.games) & 1
+        if self.format.point_is_tiebreak[self.point_state] and tiebreak_server_swapped(self.game_points):
+            server ^= 1
+        return server
 
     def add_game(self, player_index, current_set):
         """
@@ -63,14 +111,14 @@ class Match:
         self.sets[player_index][current_set] = self.games[player_index]
         self.sets[other_index][current_set] = self.games[other_index]
 
-        # Code to decide if someone has won the set
-        if self.games[player_index] >= 6 and (self.games[player_index] - self.games[other_index]) >= 2:
-            return True
-        return False
+        # The set table decides if someone has won the set
+        self.set_state = self.format.set_next[self.set_state * 2 + player_index]
+        return self.set_state < 0
 
     def reset_games(self):
         """Reset the games won by both players to 0."""
         self.games = [0, 0]
+        self.set_state = self.format.set_start
     
     def calculate_point(self, server, receiver):
         """
@@ -84,8 +132,9 @@ class Match:
         int: Index of the player who won the point.
         """
         # Server advantage: roll two random numbers, take the higher
-        server_roll = max(random.uniform(0, 1), random.uniform(0, 1), random.uniform(0, 1))
-        receiver_roll = max(random.uniform(0, 1), random.uniform(0, 1))
+        roll = self.rng.random  # Uniform in [0, 1) for both random.Random and NumPy generators
+        server_roll = max(roll(), roll(), roll())
+        receiver_roll = max(roll(), roll())
 
         # Multiply each roll by the player's chance to win
         server_score = server_roll * self.players[server].chance_to_win
@@ -106,7 +155,103 @@ class Match:
         """
         receiver = 1 - server
         point_winner = self.calculate_point(server, receiver)
+        self.record_point(server, point_winner)
+
+    def record_point(self, server, point_winner):
+        """
+        Score a point whose winner is already known.
+
+        If the match has a log, the point is appended to it as the byte
+        server << 1 | point_winner, which is all a replay needs.
+
+        Parameters:
+        server (int): Index of the player who served.
+        point_winner (int): Index of the player who won the point.
+        """
         self.add_points(point_winner)
+        self.point_count += 1
+        if self.log is not None:
+            self.log.append(server << 1 | point_winner)
+
+    def game_winner(self):
+        """
+        Return the index of the player who won the current game, or None if it is still going.
+        """
+        if self.point_state < 0:
+            return ~self.point_state
+        return None
+
+    def end_game(self, winner):
+        """
+        Award the finished game to the winner, move on to the next set if needed and reset the points.
+
+        Parameters:
+        winner (int): Index of the player who won the game.
+        """
+        if self.add_game(winner, self.current_set):  # Checks if the set is won
+            self.match_state = self.format.match_next[self.match_state * 2 + winner]
+            self.current_set += 1  # Move onto next set
+            self.reset_games()
+        self.reset_points()
+
+    def is_over(self):
+        """
+        Check if the match is decided.
+
+        Returns:
+        bool: True if a player has won the sets the format needs, two in a best of three.
+        """
+        return self.match_state < 0
+
+    def winner(self):
+        """
+        Return the index of the player who has won the match, or who has won more sets so far.
+        """
+        if self.match_state < 0:
+            return ~self.match_state
+        if self.calculate_sets_won(0) > self.calculate_sets_won(1):
+            return 0
+        return 1
+
+    def play_point(self):
+        """
+        Play one point with the correct server and settle the game if it ends.
+
+        Returns:
+        int or None: Index of the game winner if the point ended a game, otherwise None.
+        """
+        self.simulate_point(self.server())
+        winner = self.game_winner()
+        if winner is not None:
+            self.end_game(winner)
+        return winner
+
+    def replay_point(self, code):
+        """
+        Play one point from a log byte instead of rolling for it.
+
+        Parameters:
+        code (int): The byte recorded by record_point.
+
+        Returns:
+        int or None: Index of the game winner if the point ended a game, otherwise None.
+        """
+        self.record_point(code >> 1, code & 1)
+        winner = self.game_winner()
+        if winner is not None:
+            self.end_game(winner)
+        return winner
+
+    def play(self):
+        """
+        Play the match to completion without any delays or display updates.
+
+        Returns:
+        MatchResult: The winner, the set scores and the number of points played.
+        """
+        while not self.is_over():
+            self.play_point()
+        return MatchResult(self.winner(), [row[:self.current_set] for row in self.sets], self.point_count)
 
     def calculate_sets_won(self, player_index):
         """
@@ -119,11 +264,55 @@ class Match:
         int: The number of sets the player has won.
         """
         sets_won = 0
-        for set_index in range(len(self.sets)):
+        for set_index in range(len(self.sets[player_index])):
             # If the player's score is higher than the opponent's in this set
             if self.sets[player_index][set_index] > self.sets[1 - player_index][set_index]:
                 sets_won += 1
         return sets_won
 
+    def pack_state(self):
+        """
+        Pack the score of the match into STATE_FORMAT.size bytes.
+
+        Returns:
+        bytes: The packed states, games, set scores and current set.
+        """
+        padding = [0] * (MAX_SETS - self.format.best_of)
+        return STATE_FORMAT.pack(self.point_state, self.set_state, self.match_state, self.game_points,
+                                 *self.games, *self.sets[0], *padding, *self.sets[1], *padding, self.current_set)
+
+    def unpack_state(self, data):
+        """
+        Restore the score of the match from bytes made by pack_state of a match with the same format.
+
+        Parameters:
+        data (bytes): The packed state.
+        """
+        values = STATE_FORMAT.unpack(data)
+        self.point_state, self.set_state, self.match_state, self.game_points = values[0:4]
+        self.games = list(values[4:6])
+        best_of = self.format.best_of
+        self.sets = [list(values[6:6 + best_of]), list(values[6 + MAX_SETS:6 + MAX_SETS + best_of])]
+        self.current_set = values[6 + 2 * MAX_SETS]
+
     def __str__(self):
-        return f"Sets: {self.sets} | Points: {self.points}"
\ No newline at end of file
+        return f"Sets: {self.sets} | Points: {list(self.point_labels())}"
+
+def simulate_match(player_1, player_2, seed=None, rng=None, log=None, match_format=CLASSIC):
+    """
+    Simulate a full match between two players.
+
+    Parameters:
+    player_1 (Player): The first player, who serves first in every set.
+    player_2 (Player): The second player.
+    seed (int, optional): Seed for the point rolls, making the result reproducible.
+    rng (random.Random or numpy.random.Generator, optional): Generator to use instead of seeding a new one.
+    log (bytearray, optional): Receives one byte per point, for example for MatchLogWriter.
+    match_format (MatchFormat, optional): The rules, see scoring.py. Defaults to best of three advantage sets.
+
+    Returns:
+    MatchResult: The result of the match.
+    """
+    if rng is None:
+        rng = random.Random(seed)
+    return Match([player_1, player_2], rng, log, match_format).play()
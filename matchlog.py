@@ -0,0 +1,165 @@
+'''
+An append-only, point-by-point archive of matches that can be replayed.
+
+Every point is one byte, server << 1 | point_winner, appended to "<name>.log".
+Every match adds one INDEX_FORMAT entry to "<name>.idx" with where its points
+start, how many there are and both players' chance_to_win. Both files are
+memory-mapped for reading, so archives of millions of matches are never
+read into memory as a whole.
+'''
+
+import mmap
+import os
+import random
+import struct
+from match import Match
+from scoring import CLASSIC
+from player import Player
+
+# Offset of the first point, number of points and both chance_to_win values
+INDEX_FORMAT = struct.Struct("<QIdd")
+
+class MatchLogWriter:
+    '''Appends finished matches to a match log.'''
+    def __init__(self, filename="matches"):
+        """
+        Initialize a new MatchLogWriter instance.
+
+        Parameters:
+        filename (str, optional): Name of the log without extension. The points go to
+        filename.log and the index to filename.idx. Existing logs are appended to.
+        """
+        self.points_file = open(f"{filename}.log", "ab")
+        self.index_file = open(f"{filename}.idx", "ab")
+        self.offset = self.points_file.tell()
+        self.count = self.index_file.tell() // INDEX_FORMAT.size
+
+    def append(self, match):
+        """
+        Add a match to the log.
+
+        Parameters:
+        match (Match): A match created with a log, e.g. Match(players, rng, bytearray()).
+
+        Returns:
+        int: The index of the match in the log.
+        """
+        chances = [player.chance_to_win for player in match.players]
+        self.points_file.write(match.log)
+        self.index_file.write(INDEX_FORMAT.pack(self.offset, len(match.log), *chances))
+        self.offset += len(match.log)
+        self.count += 1
+        return self.count - 1
+
+    def record(self, player_1, player_2, seed=None, match_format=CLASSIC):
+        """
+        Simulate a match between two players and add it to the log.
+
+        Parameters:
+        player_1 (Player): The first player, who serves first in every set.
+        player_2 (Player): The second player.
+        seed (int, optional): Seed for the point rolls.
+        match_format (MatchFormat, optional): The rules, see scoring.py.
+
+        Returns:
+        Match: The finished match.
+        """
+        match = Match([player_1, player_2], random.Random(seed), bytearray(), match_format)
+        match.play()
+        self.append(match)
+        return match
+
+    def flush(self):
+        """Write buffered matches to disk. The points go first, so the index never points past them."""
+        self.points_file.flush()
+        self.index_file.flush()
+
+    def close(self):
+        self.flush()
+        self.points_file.close()
+        self.index_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+def map_file(filename):
+    """Memory-map a file for reading. Empty files, which can't be mapped, give empty bytes."""
+    with open(filename, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_READ)
+
+class MatchLog:
+    '''Reads and replays the matches in a match log.'''
+    def __init__(self, filename="matches"):
+        """
+        Initialize a new MatchLog instance.
+
+        Parameters:
+        filename (str, optional): Name of the log without extension, as given to MatchLogWriter.
+        """
+        self.points = map_file(f"{filename}.log")
+        self.index = map_file(f"{filename}.idx")
+
+    def entry(self, match_index):
+        """
+        Return the index entry of a match.
+
+        Returns:
+        tuple: The offset of its first point, the number of points and both chance_to_win values.
+        """
+        return INDEX_FORMAT.unpack_from(self.index, match_index * INDEX_FORMAT.size)
+
+    def point_codes(self, match_index):
+        """
+        Return the point bytes of a match.
+
+        Parameters:
+        match_index (int): The index of the match, as returned by MatchLogWriter.append.
+        """
+        offset, count = self.entry(match_index)[:2]
+        return self.points[offset:offset + count]
+
+    def players(self, match_index):
+        """Return stand-in players with the chance_to_win values recorded for a match."""
+        chance_1, chance_2 = self.entry(match_index)[2:]
+        return [Player("Player 1", chance_1), Player("Player 2", chance_2)]
+
+    def replay(self, match_index, points=None, players=None, match_format=CLASSIC):
+        """
+        Rebuild the state of a match after some of its points.
+
+        Parameters:
+        match_index (int): The index of the match.
+        points (int, optional): Number of points to replay. Defaults to the whole match.
+        players (list, optional): The two players. Defaults to stand-ins from players().
+        match_format (MatchFormat, optional): The rules the match was played with. The log
+        doesn't store them, so they must be the same as when it was recorded.
+
+        Returns:
+        Match: The match with the score it had after those points.
+        """
+        match = Match(players or self.players(match_index), match_format = match_format)
+        for code in self.point_codes(match_index)[:points]:
+            match.replay_point(code)
+        return match
+
+    def close(self):
+        for mapped in (self.points, self.index):
+            if isinstance(mapped, mmap.mmap):
+                mapped.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return len(self.index) // INDEX_FORMAT.size
@@ -0,0 +1,127 @@
+'''
+A bounded cache of pre-match win probabilities for pairs of chance_to_win values.
+'''
+
+from collections import OrderedDict
+from exact import match_win_probability_from_chances
+
+def monte_carlo_estimator(n=10000, seed=None):
+    """
+    Build an estimator that simulates n matches instead of solving exactly.
+
+    Parameters:
+    n (int, optional): Number of matches per pairing.
+    seed (int, optional): Root seed, so the same pairing always gets the same estimate.
+
+    Returns:
+    function: Takes two chance_to_win values and returns the first player's estimated win probability.
+    """
+    from player import Player
+    from streams import numpy_stream
+    from vectorized import simulate_matches
+
+    def estimate(chance_1, chance_2):
+        rng = numpy_stream(seed or 0, int(chance_1 * 10 ** 9), int(chance_2 * 10 ** 9))
+        return simulate_matches(Player("", chance_1), Player("", chance_2), n, rng = rng).win_probability()
+
+    return estimate
+
+def adaptive_estimator(target_width=0.01, seed=None):
+    """
+    Build an estimator that simulates only until its confidence interval is narrow enough.
+
+    Every pairing uses the same seed, so the estimates share their rolls and compare fairly.
+
+    Parameters:
+    target_width (float, optional): Width of the 95 % confidence interval to stop at.
+    seed (int, optional): Root seed shared by every pairing.
+
+    Returns:
+    function: Takes two chance_to_win values and returns the first player's estimated win probability.
+    """
+    from player import Player
+    from adaptive import estimate_match_win
+
+    def estimate(chance_1, chance_2):
+        return estimate_match_win(Player("", chance_1), Player("", chance_2), target_width, seed = seed or 0).estimate
+
+    return estimate
+
+class OddsCache:
+    '''Least-recently-used cache of match-win probabilities keyed on (chance_to_win_1, chance_to_win_2).
+
+    Entries are keyed on the chances themselves, so a player whose chance_to_win
+    changes simply looks up a new entry and the old one ages out.
+    '''
+    def __init__(self, max_size=100000, estimator=match_win_probability_from_chances):
+        """
+        Initialize a new OddsCache instance.
+
+        Parameters:
+        max_size (int, optional): The most pairings kept before the least recently used is dropped.
+        estimator (function, optional): Fills a missing pairing. Defaults to the exact solver.
+        """
+        self.max_size = max_size
+        self.estimator = estimator
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def win_probability(self, player_1, player_2):
+        """
+        Return the chance that player 1 beats player 2, serving first.
+
+        Parameters:
+        player_1 (Player): The first player.
+        player_2 (Player): The second player.
+        """
+        return self.lookup(player_1.chance_to_win, player_2.chance_to_win)
+
+    def lookup(self, chance_1, chance_2):
+        """
+        Return the first player's win probability for a pair of chance_to_win values.
+        """
+        key = (chance_1, chance_2)
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+        self.misses += 1
+        probability = self.estimator(chance_1, chance_2)
+        self.entries[key] = probability
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last = False)  # Drop the least recently used pairing
+        return probability
+
+    def precompute(self, players):
+        """
+        Fill the cache for every pairing of the players and return the full matrix.
+
+        Players with the same chance_to_win share one calculation.
+
+        Parameters:
+        players (list): The roster.
+
+        Returns:
+        list: matrix[i][j] is the chance that players[i] beats players[j] (0.5 on the diagonal).
+        """
+        chances = sorted({player.chance_to_win for player in players})
+        table = {(a, b): self.lookup(a, b) for a in chances for b in chances}
+        matrix = []
+        for player_1 in players:
+            row = []
+            for player_2 in players:
+                if player_1 is player_2:
+                    row.append(0.5)
+                else:
+                    row.append(table[(player_1.chance_to_win, player_2.chance_to_win)])
+            matrix.append(row)
+        return matrix
+
+    def clear(self):
+        """Drop every cached pairing."""
+        self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
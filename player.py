@@ -1,3 +1,9 @@
+import heapq
+import mmap
+import os
+
+result_listeners = []  # Called with the player after every win or loss of any player, e.g. by a Leaderboard
+
 def calculate_win_rate(player):
     """
     Calculate the player's win rate as a percentage.
@@ -9,8 +15,53 @@ def calculate_win_rate(player):
         return round(100 * player.wins / player.played, 2)
     return 0.0  # No matches played yet, win rate is 0%
 
+def write_lines_atomically(filename, lines):
+    """
+    Replace a file's content without ever leaving it half written.
+
+    The lines are written to a temporary file next to the target, which is then
+    renamed over it, so a crash leaves either the old or the new file.
+
+    Parameters:
+    filename (str): The path to the file to replace.
+    lines (list): The lines to write, each ending with a newline.
+    """
+    temp_filename = f"{filename}.tmp"
+    with open(temp_filename, "w") as file:
+        for index, line in enumerate(lines):
+            if index == len(lines) - 1:  # Last line check
+                file.write(line.rstrip("\n"))  # Write without newline
+            else:
+                file.write(line)  # Write line with newline
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_filename, filename)
+
+def apply_deltas_to_file(deltas, filename="players.txt"):
+    """
+    Add win and loss counts to several players in a single rewrite of the file.
+
+    Parameters:
+    deltas (dict): Maps a player's name to the [wins, losses] to add.
+    filename (str): The path to the file containing player data.
+    """
+    with open(filename, "r") as file:
+        lines = file.readlines()
+
+    # Every player takes four lines: name, chance to win, wins and losses
+    for i in range(0, len(lines) - 3, 4):
+        name = lines[i].strip()
+        if name in deltas:
+            wins, losses = deltas[name]
+            lines[i + 2] = f"{int(lines[i + 2]) + wins}\n"
+            lines[i + 3] = f"{int(lines[i + 3]) + losses}\n"
+
+    write_lines_atomically(filename, lines)
+
 class Player:
     '''Represents a tennis player with associated statistics and methods to modify them.'''
+    __slots__ = ("name", "wins", "losses", "played", "chance_to_win", "win_rate")
+
     def __init__(self, name, chance_to_win, wins=0, losses=0):
         """
         Initialize a new Player instance.
@@ -36,6 +87,8 @@ class Player:
 
         # Updates win rate after win
         self.win_rate = calculate_win_rate(self)
+        for listener in result_listeners:
+            listener(self)
 
     def add_loss(self):
         """Increment the loss count and update related stats."""
@@ -45,6 +98,8 @@ class Player:
 
         # Updates win rate after loss
         self.win_rate = calculate_win_rate(self)
+        for listener in result_listeners:
+            listener(self)
 
     def update_stats_in_file(self, filename = "players.txt"):
         """
@@ -76,12 +131,7 @@ class Player:
                 i += 1
 
         # Rewrite the file with updated content
-        with open(filename, "w") as file:
-            for index, line in enumerate(updated_lines):
-                if index == len(updated_lines) - 1:  # Last line check
-                    file.write(line.rstrip("\n"))  # Write without newline
-                else:
-                    file.write(line)  # Write line with newline
+        write_lines_atomically(filename, updated_lines)
 
     def __lt__(self, other):
         """
@@ -99,3 +149,68 @@ class Player:
 
         return f"{player_data}"
 
+def iter_players_file(filename="players.txt", use_mmap=False):
+    """
+    Yield players one at a time from a text file with four lines per player.
+
+    Each player is stored as their name, chance to win a serve, wins and losses.
+
+    Parameters:
+    filename (str): The path to the file containing player data.
+    use_mmap (bool, optional): Memory-map the file instead of reading it through a buffer,
+    which avoids copying very large rosters into Python file buffers.
+
+    Yields:
+    Player: The next player in the file.
+    """
+    if use_mmap:
+        with open(filename, "rb") as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return  # An empty file can't be mapped
+            with mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_READ) as mapped:
+                name = mapped.readline().strip()
+                # Read player data until the end of the file
+                while name:
+                    chance_to_win = float(mapped.readline())
+                    wins = int(mapped.readline())
+                    losses = int(mapped.readline())
+                    yield Player(name.decode(), chance_to_win, wins, losses)
+                    name = mapped.readline().strip()  # Read next name or terminate the loop
+        return
+
+    with open(filename, "r") as file:
+        name = file.readline().strip()
+        # Read player data until the end of the file
+        while name:
+            chance_to_win = float(file.readline().strip())
+            wins = int(file.readline().strip())
+            losses = int(file.readline().strip())
+            yield Player(name, chance_to_win, wins, losses)
+            name = file.readline().strip()  # Read next name or terminate the loop
+
+def read_players_file(filename="players.txt"):
+    """
+    Read all players from a text file with four lines per player.
+
+    Parameters:
+    filename (str): The path to the file containing player data.
+
+    Returns:
+    list: The Player instances in the order they appear in the file.
+    """
+    return list(iter_players_file(filename))
+
+def top_players(players, k):
+    """
+    Pick the k players with the highest win rate without sorting all of them.
+
+    Keeps a heap of at most k players, so a lazily read roster is never held in memory.
+
+    Parameters:
+    players (iterable): The players to choose from, for example iter_players_file().
+    k (int): Number of players to keep.
+
+    Returns:
+    list: The k best players, highest win rate first.
+    """
+    return heapq.nlargest(k, players, key = lambda player: player.win_rate)
@@ -0,0 +1,188 @@
+'''
+Table-driven tennis scoring.
+
+A MatchFormat compiles the rules of a match into transition tables. Every score
+within a game, every games score within a set and every sets score within a
+match is a small integer state, and the state after a point or game is a single
+lookup:
+
+    state = format.point_next[state * 2 + winner]
+
+A negative state means the game, set or match is over, and ~state is the index
+of the player who won it. Scores that behave the same, like deuce and 40-40 in
+a long game or 5-5 and 7-7 in a set without tiebreak, share a state, so the
+tables are small and finite while games and sets can still go on as long as
+the rules allow. Match keeps the real games count separately for display.
+'''
+
+GAME_POINT_LABELS = (0, 15, 30, 40, "Adv")
+MAX_SETS = 5  # The most sets Match.pack_state has room for
+
+def tiebreak_server_swapped(points_played):
+    """
+    Return True if the player who started serving a tiebreak doesn't serve its next point.
+
+    Only tiebreaks change server within a game: the first point is served by one
+    player, then each serves two points in turn. Works on NumPy arrays of counts too.
+
+    Parameters:
+    points_played (int): Points played in the tiebreak so far.
+    """
+    return (points_played + 1) & 2 != 0
+
+class MatchFormat:
+    '''The rules of a match, compiled into state transition tables.'''
+    def __init__(self, best_of=3, tiebreak=False, no_ad=False):
+        """
+        Initialize a new MatchFormat instance.
+
+        Parameters:
+        best_of (int, optional): Number of sets in the match, an odd number up to MAX_SETS. Defaults to 3.
+        tiebreak (bool, optional): Decide a set at 6-6 with a tiebreak game to 7 points. Defaults
+        to advantage sets, which need a two game lead however long that takes.
+        no_ad (bool, optional): The point after deuce decides the game. Tiebreaks still
+        need a two point lead.
+
+        Raises:
+        ValueError: If best_of is even or not between 1 and MAX_SETS.
+        """
+        if best_of % 2 == 0 or not 1 <= best_of <= MAX_SETS:
+            raise ValueError(f"A match is best of an odd number of sets up to {MAX_SETS}, not {best_of}.")
+        self.best_of = best_of
+        self.tiebreak = tiebreak
+        self.no_ad = no_ad
+        self.sets_to_win = best_of // 2 + 1
+
+        # Point states: every score of a normal game, then every score of a tiebreak
+        scores = []  # (is_tiebreak, points_1, points_2) of every state
+        self.game_start = self.add_race(scores, False, 4, no_ad)
+        self.tiebreak_start = self.add_race(scores, True, 7, False) if tiebreak else self.game_start
+        index = {score: state for state, score in enumerate(scores)}
+        self.point_next = []
+        for is_tiebreak, points_1, points_2 in scores:
+            for winner_points in ((points_1 + 1, points_2), (points_1, points_2 + 1)):
+                self.point_next.append(self.race_next(index, is_tiebreak, *winner_points))
+        self.point_is_tiebreak = [score[0] for score in scores]
+        self.point_scores = [score[1:] for score in scores]
+
+        # Set states: every games score that needs telling apart. With tiebreaks a set
+        # ends 7-6 at most, without them 5-5, 6-6 and so on all share the 5-5 state
+        games = [(games_1, games_2) for games_1 in range(7) for games_2 in range(7)]
+        if not tiebreak:
+            games.remove((6, 6))
+        games = [score for score in games if self.set_winner(*score) is None]
+        set_index = {score: state for state, score in enumerate(games)}
+        self.set_next = []
+        for games_1, games_2 in games:
+            for score in ((games_1 + 1, games_2), (games_1, games_2 + 1)):
+                winner = self.set_winner(*score)
+                if winner is not None:
+                    self.set_next.append(~winner)
+                elif score in set_index:
+                    self.set_next.append(set_index[score])
+                else:
+                    self.set_next.append(set_index[(score[0] - 1, score[1] - 1)])  # Same as one game earlier
+        self.set_tiebreak_next = [tiebreak and score == (6, 6) for score in games]
+        self.set_scores = games
+        self.set_start = 0
+
+        # Match states: sets won by each player
+        sets = [(sets_1, sets_2) for sets_1 in range(self.sets_to_win) for sets_2 in range(self.sets_to_win)]
+        match_index = {score: state for state, score in enumerate(sets)}
+        self.match_next = []
+        for sets_1, sets_2 in sets:
+            self.match_next.append(match_index.get((sets_1 + 1, sets_2), ~0))
+            self.match_next.append(match_index.get((sets_1, sets_2 + 1), ~1))
+        self.match_scores = sets
+        self.match_start = 0
+
+    @staticmethod
+    def add_race(scores, is_tiebreak, target, no_ad):
+        """
+        Add the states of a game won by the first player to reach target points.
+
+        Without no_ad the winner also needs a two point lead, and every score past
+        (target - 1)-all is folded onto deuce or advantage.
+
+        Returns:
+        int: The state of the score 0-0.
+        """
+        start = len(scores)
+        for points_1 in range(target + 1):
+            for points_2 in range(target + 1):
+                finished = max(points_1, points_2) >= target and (no_ad or abs(points_1 - points_2) >= 2)
+                over_deuce = min(points_1, points_2) >= target  # Folded onto the score one point earlier
+                if not finished and not over_deuce:
+                    scores.append((is_tiebreak, points_1, points_2))
+        return start
+
+    def race_next(self, index, is_tiebreak, points_1, points_2):
+        """Return the state after a point, or ~winner if the point ended the game."""
+        target = 7 if is_tiebreak else 4
+        no_ad = self.no_ad and not is_tiebreak
+        if points_1 >= target and (no_ad or points_1 - points_2 >= 2):
+            return ~0
+        if points_2 >= target and (no_ad or points_2 - points_1 >= 2):
+            return ~1
+        if min(points_1, points_2) >= target:
+            points_1, points_2 = points_1 - 1, points_2 - 1  # Back to deuce
+        return index[(is_tiebreak, points_1, points_2)]
+
+    def set_winner(self, games_1, games_2):
+        """Return the index of the player who has won a set with this games score, or None."""
+        for player, (own, other) in enumerate(((games_1, games_2), (games_2, games_1))):
+            if own >= 6 and own - other >= 2:
+                return player
+            if self.tiebreak and own == 7 and other == 6:
+                return player
+        return None
+
+    def point_labels(self, state, game_points=0):
+        """
+        Return the score of a point state as it is shown on a scoreboard.
+
+        Parameters:
+        state (int): The point state.
+        game_points (int, optional): Points played in the game so far, used to show
+        the real score of a long tiebreak instead of its folded state.
+
+        Returns:
+        tuple: The labels, for example (40, "Adv") or (8, 7) in a tiebreak.
+        """
+        if state < 0:
+            return ("Winner", "Loser") if ~state == 0 else ("Loser", "Winner")
+        points_1, points_2 = self.point_scores[state]
+        if self.point_is_tiebreak[state]:
+            if game_points > points_1 + points_2:  # Past 6-6 the state only knows the lead
+                lead = points_1 - points_2
+                return (game_points + lead) // 2, (game_points - lead) // 2
+            return points_1, points_2
+        return GAME_POINT_LABELS[points_1], GAME_POINT_LABELS[points_2]
+
+    def arrays(self):
+        """
+        Return the tables as NumPy arrays for the batch engine, built once per format.
+
+        Returns:
+        dict: point_next, point_is_tiebreak and set_next as int16 or bool arrays,
+        and set_tiebreak_next.
+        """
+        if not hasattr(self, "numpy_tables"):
+            import numpy as np  # Only needed by the batch engine
+            self.numpy_tables = {
+                "point_next": np.array(self.point_next, dtype = np.int16),
+                "point_is_tiebreak": np.array(self.point_is_tiebreak, dtype = bool),
+                "set_next": np.array(self.set_next, dtype = np.int16),
+                "set_tiebreak_next": np.array(self.set_tiebreak_next, dtype = bool),
+            }
+        return self.numpy_tables
+
+    def __repr__(self):
+        return f"MatchFormat(best_of={self.best_of}, tiebreak={self.tiebreak}, no_ad={self.no_ad})"
+
+# The formats used most often. CLASSIC is the original rules of the simulator.
+CLASSIC = MatchFormat()
+TIEBREAK_SETS = MatchFormat(tiebreak = True)
+NO_AD = MatchFormat(tiebreak = True, no_ad = True)
+BEST_OF_FIVE = MatchFormat(best_of = 5, tiebreak = True)
+FORMATS = {"classic": CLASSIC, "tiebreak": TIEBREAK_SETS, "no-ad": NO_AD, "best-of-five": BEST_OF_FIVE}
@@ -0,0 +1,159 @@
+'''
+Round-robin season simulation spread over a process pool.
+'''
+
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from player import Player
+from match import simulate_match
+from streams import new_root_seed, python_stream
+
+def round_robin(player_count, rounds=1):
+    """
+    Schedule every player against every other player.
+
+    Parameters:
+    player_count (int): Number of players in the season.
+    rounds (int, optional): How many times each pairing is played. Defaults to 1.
+
+    Returns:
+    list: (first, second) index pairs, where first serves first. The order is
+    swapped every other round so both players get to serve first equally often.
+    """
+    fixtures = []
+    for round_index in range(rounds):
+        for first in range(player_count):
+            for second in range(first + 1, player_count):
+                if round_index % 2 == 0:
+                    fixtures.append((first, second))
+                else:
+                    fixtures.append((second, first))
+    return fixtures
+
+def play_chunk(chunk):
+    """
+    Play a chunk of matches inside a worker process.
+
+    Parameters:
+    chunk (tuple): The season seed, the index of the first match and a list of
+    (chance_to_win_1, chance_to_win_2) pairs.
+
+    Returns:
+    list: The winner index (0 or 1) of every match in the chunk.
+    """
+    season_seed, start, pairings = chunk
+    winners = []
+    for offset, (chance_1, chance_2) in enumerate(pairings):
+        player_1 = Player("", chance_1)
+        player_2 = Player("", chance_2)
+        # The stream only depends on the season seed and the match index, so a match
+        # plays out the same no matter which worker runs it
+        rng = python_stream(season_seed, start + offset)
+        winners.append(simulate_match(player_1, player_2, rng = rng).winner)
+    return winners
+
+class SeasonResult:
+    '''The fixtures and winners of a simulated season.'''
+    def __init__(self, players, fixtures, winners):
+        """
+        Initialize a new SeasonResult instance.
+
+        Parameters:
+        players (list): The players of the season.
+        fixtures (list): (first, second) index pairs of every match.
+        winners (list): The winner index (0 or 1) of every match.
+        """
+        self.players = players
+        self.fixtures = fixtures
+        self.winners = winners
+
+    def records(self):
+        """
+        Count the wins and losses of every player in this season.
+
+        Returns:
+        list: A [wins, losses] pair per player, in the order of self.players.
+        """
+        records = [[0, 0] for _ in self.players]
+        for (first, second), winner in zip(self.fixtures, self.winners):
+            winner_index = (first, second)[winner]
+            loser_index = (first, second)[1 - winner]
+            records[winner_index][0] += 1
+            records[loser_index][1] += 1
+        return records
+
+    def apply(self):
+        """Add the season's wins and losses to the Player objects."""
+        for player, (wins, losses) in zip(self.players, self.records()):
+            for _ in range(wins):
+                player.add_win()
+            for _ in range(losses):
+                player.add_loss()
+
+def simulate_season(players, rounds=1, seed=None, workers=None, chunk_size=500, checkpoint=None,
+                    checkpoint_interval=5.0, apply=True):
+    """
+    Simulate a round-robin season and add the results to the players.
+
+    Parameters:
+    players (list): The Player instances taking part.
+    rounds (int, optional): How many times each pairing is played. Defaults to 1.
+    seed (int, optional): Seed for the season. The same seed gives the same results
+    for any number of workers.
+    workers (int, optional): Number of worker processes. Defaults to one per core, 1
+    plays in this process.
+    chunk_size (int, optional): Number of matches sent to a worker at a time.
+    checkpoint (str, optional): File to save progress to every checkpoint_interval
+    seconds. If it holds the progress of an interrupted run of the same season, the
+    season carries on from there and ends with the same results as an uninterrupted
+    run. The caller removes it once the results are saved.
+    checkpoint_interval (float, optional): Seconds between checkpoints.
+    apply (bool, optional): Add the results to the players. Pass False to call
+    SeasonResult.apply() later, for example from the Tk thread.
+
+    Returns:
+    SeasonResult: The fixtures and winners of the season.
+
+    Raises:
+    ValueError: If the checkpoint belongs to a different season.
+    """
+    if seed is None:
+        seed = new_root_seed()
+    fixtures = round_robin(len(players), rounds)
+    chances = [player.chance_to_win for player in players]
+
+    # Winners of the matches an earlier run already played. Match k always uses
+    # stream k of the seed, so the rest of the season plays out the same
+    winners = []
+    saver = None
+    if checkpoint is not None:
+        from checkpoint import Checkpoint, fingerprint
+        settings = {"seed": seed, "rounds": rounds, "players": fingerprint(players)}
+        saver = Checkpoint(checkpoint, "season", settings, checkpoint_interval)
+        saved = saver.load()
+        if saved is not None:
+            winners = list(saved[2])
+
+    # Split the rest of the schedule into chunks that remember where they start
+    chunks = []
+    for start in range(len(winners), len(fixtures), chunk_size):
+        pairings = [(chances[first], chances[second]) for first, second in fixtures[start:start + chunk_size]]
+        chunks.append((seed, start, pairings))
+
+    with ProcessPoolExecutor(max_workers = workers) if workers != 1 else nullcontext() as executor:
+        try:
+            for chunk_winners in (executor.map if executor is not None else map)(play_chunk, chunks):
+                winners.extend(chunk_winners)
+                if saver is not None and saver.due():
+                    saver.save(len(winners), payload = bytes(winners))
+        except BaseException:  # Interrupted, keep everything played so far
+            if saver is not None:
+                saver.save(len(winners), payload = bytes(winners))
+            raise
+    if saver is not None:
+        saver.save(len(winners), payload = bytes(winners))
+
+    result = SeasonResult(players, fixtures, winners)
+    if apply:
+        result.apply()  # Aggregate into the players once at the end
+    return result
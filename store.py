@@ -0,0 +1,205 @@
+'''
+Indexed player storage in an SQLite database.
+
+Players are keyed by name, so looking up or updating one player touches a
+single row instead of rewriting the whole roster like 'players.txt'.
+'''
+
+import os
+import sqlite3
+import threading
+from player import Player, read_players_file
+
+class PlayerStore:
+    '''Player statistics kept in an SQLite table with the player's name as primary key.'''
+    def __init__(self, filename="players.db"):
+        """
+        Open (and create if needed) a player store.
+
+        Parameters:
+        filename (str): The path to the database file, or ":memory:".
+        """
+        self.filename = filename
+        # Match windows save from their simulation threads, so access is serialized by a lock
+        self.connection = sqlite3.connect(filename, check_same_thread = False)
+        self.lock = threading.Lock()
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS players ("
+            "name TEXT PRIMARY KEY, "
+            "chance_to_win REAL NOT NULL, "
+            "wins INTEGER NOT NULL DEFAULT 0, "
+            "losses INTEGER NOT NULL DEFAULT 0)"
+        )
+        # Ids of checkpointed runs whose results are saved, so a resumed run is never saved twice
+        self.connection.execute("CREATE TABLE IF NOT EXISTS applied_runs (run TEXT PRIMARY KEY)")
+        self.connection.commit()
+
+    def add(self, player):
+        """
+        Add a new player to the store.
+
+        Parameters:
+        player (Player): The player to add.
+
+        Raises:
+        ValueError: If a player with the same name is already stored.
+        """
+        try:
+            with self.lock, self.connection:
+                self.connection.execute(
+                    "INSERT INTO players (name, chance_to_win, wins, losses) VALUES (?, ?, ?, ?)",
+                    (player.name, player.chance_to_win, player.wins, player.losses),
+                )
+        except sqlite3.IntegrityError:
+            raise ValueError(f"A player named {player.name} already exists.")
+
+    def get(self, name):
+        """
+        Look up a player by name.
+
+        Parameters:
+        name (str): The player's name.
+
+        Returns:
+        Player or None: The stored player, or None if there is no such player.
+        """
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT name, chance_to_win, wins, losses FROM players WHERE name = ?", (name,)
+            ).fetchone()
+        if row is None:
+            return None
+        return Player(*row)
+
+    def update_stats(self, player):
+        """
+        Write a player's chance to win, wins and losses to their row.
+
+        Parameters:
+        player (Player): The player whose stats should be saved.
+        """
+        with self.lock, self.connection:
+            self.connection.execute(
+                "UPDATE players SET chance_to_win = ?, wins = ?, losses = ? WHERE name = ?",
+                (player.chance_to_win, player.wins, player.losses, player.name),
+            )
+
+    def apply_deltas(self, deltas, run=None):
+        """
+        Add win and loss counts to several players in one transaction.
+
+        Parameters:
+        deltas (dict): Maps a player's name to the [wins, losses] to add.
+        run (str, optional): Id of the run the results come from, see checkpoint.py. It is
+        recorded in the same transaction, and a run that is already recorded isn't added again.
+
+        Returns:
+        bool: False if the run's results were already saved, True otherwise.
+        """
+        with self.lock, self.connection:
+            if run is not None:
+                try:
+                    self.connection.execute("INSERT INTO applied_runs (run) VALUES (?)", (run,))
+                except sqlite3.IntegrityError:
+                    return False
+            self.connection.executemany(
+                "UPDATE players SET wins = wins + ?, losses = losses + ? WHERE name = ?",
+                [(wins, losses, name) for name, (wins, losses) in deltas.items()],
+            )
+        return True
+
+    def update_chances(self, players):
+        """
+        Write the chance to win of several players in one transaction.
+
+        Parameters:
+        players (list): The players whose chance_to_win should be saved.
+        """
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "UPDATE players SET chance_to_win = ? WHERE name = ?",
+                [(player.chance_to_win, player.name) for player in players],
+            )
+
+    def load_players(self):
+        """
+        Load every stored player.
+
+        Returns:
+        list: The Player instances in the order they were added.
+        """
+        with self.lock:
+            rows = self.connection.execute("SELECT name, chance_to_win, wins, losses FROM players ORDER BY rowid").fetchall()
+        return [Player(*row) for row in rows]
+
+    def iter_players(self, batch_size=1000):
+        """
+        Yield every stored player, reading the table in batches.
+
+        Parameters:
+        batch_size (int, optional): Number of rows fetched at a time.
+
+        Yields:
+        Player: The next player, in the order they were added.
+        """
+        last_rowid = 0
+        while True:
+            with self.lock:
+                rows = self.connection.execute(
+                    "SELECT rowid, name, chance_to_win, wins, losses FROM players WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                    (last_rowid, batch_size),
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield Player(*row[1:])
+            last_rowid = rows[-1][0]
+
+    def migrate_from_text(self, filename="players.txt"):
+        """
+        Copy all players from a 'players.txt' style file into the store.
+
+        Players that are already stored are overwritten with the values in the file.
+
+        Parameters:
+        filename (str): The path to the text file.
+
+        Returns:
+        int: Number of players copied.
+        """
+        players = read_players_file(filename)
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO players (name, chance_to_win, wins, losses) VALUES (?, ?, ?, ?)",
+                [(player.name, player.chance_to_win, player.wins, player.losses) for player in players],
+            )
+        return len(players)
+
+    def close(self):
+        """Close the database connection."""
+        self.connection.close()
+
+    def __len__(self):
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM players").fetchone()[0]
+
+    def __contains__(self, name):
+        with self.lock:
+            return self.connection.execute("SELECT 1 FROM players WHERE name = ?", (name,)).fetchone() is not None
+
+def open_store(filename="players.db", legacy_filename="players.txt"):
+    """
+    Open the player store, migrating the old text file the first time.
+
+    Parameters:
+    filename (str): The path to the database file.
+    legacy_filename (str): The text file to migrate from if the store is empty.
+
+    Returns:
+    PlayerStore: The opened store.
+    """
+    store = PlayerStore(filename)
+    if len(store) == 0 and os.path.exists(legacy_filename):
+        count = store.migrate_from_text(legacy_filename)
+        print(f"Migrated {count} players from {legacy_filename} to {filename}")
+    return store
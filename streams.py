@@ -0,0 +1,52 @@
+'''
+Reproducible random streams for simulations that are split across processes.
+
+A stream is named by a root seed and a key such as the index of a match. The
+same name always gives the same numbers, no matter which process asks for it
+or in which order, and different keys give independent streams.
+'''
+
+import hashlib
+import random
+
+def new_root_seed():
+    """Return a fresh 64-bit root seed for a run that wasn't given one."""
+    return random.SystemRandom().getrandbits(64)
+
+def stream_seed(root_seed, *key):
+    """
+    Derive the 128-bit seed of one stream from the root seed and its key.
+
+    Parameters:
+    root_seed (int): The seed of the whole run.
+    key (int): The position of the stream, for example the index of a match.
+
+    Returns:
+    int: The seed of the stream.
+    """
+    text = ":".join(str(part) for part in (root_seed, *key))
+    return int.from_bytes(hashlib.blake2b(text.encode(), digest_size = 16).digest(), "little")
+
+def python_stream(root_seed, *key):
+    """
+    Return a random.Random for one stream, for example for Match.
+
+    Parameters:
+    root_seed (int): The seed of the whole run.
+    key (int): The position of the stream.
+    """
+    return random.Random(stream_seed(root_seed, *key))
+
+def numpy_stream(root_seed, *key):
+    """
+    Return a NumPy Generator for one stream, for example for vectorized.simulate_matches.
+
+    Uses NumPy's SeedSequence with the key as spawn key, which is the same tree of
+    streams that SeedSequence.spawn() builds.
+
+    Parameters:
+    root_seed (int): The seed of the whole run.
+    key (int): The position of the stream.
+    """
+    import numpy as np  # Only needed by the batch engines
+    return np.random.default_rng(np.random.SeedSequence(root_seed, spawn_key = key))
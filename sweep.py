@@ -0,0 +1,144 @@
+'''
+What-if sweeps of the match-win probability over grids of chance_to_win values.
+
+sweep() fills a dense (formats, chances_1, chances_2) array with the chance that
+a player with chances_1[i], serving first, beats one with chances_2[j]. The roll
+model only depends on the ratio of the two chances, so every ratio in the grid is
+worked out once and the unique cells are spread over a process pool.
+'''
+
+import csv
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from exact import match_win_probability_from_chances
+from scoring import CLASSIC
+from streams import new_root_seed, numpy_stream
+
+def parse_chances(text):
+    """
+    Read a list of chance_to_win values from the command line.
+
+    Parameters:
+    text (str): "start:stop:count" for evenly spaced values, for example "0.5:0.95:200",
+    or a comma separated list like "0.5,0.6,0.7".
+
+    Returns:
+    ndarray: The values.
+
+    Raises:
+    ValueError: If the text is in neither form.
+    """
+    try:
+        if ":" in text:
+            start, stop, count = text.split(":")
+            return np.linspace(float(start), float(stop), int(count))
+        return np.array([float(value) for value in text.split(",")])
+    except ValueError:  # Also raised by a wrong number of parts
+        raise ValueError(f"Can't read chances from '{text}', use start:stop:count or a comma separated list.")
+
+def evaluate_chunk(chunk):
+    """
+    Work out the match-win probability of a chunk of grid cells inside a worker process.
+
+    Parameters:
+    chunk (tuple): The match format, the (chance_to_win_1, chance_to_win_2) pair of
+    every cell, the number of matches to simulate per cell (None solves exactly),
+    the sweep seed and the index of the first cell.
+
+    Returns:
+    list: The probability that the first player wins, for every cell.
+    """
+    match_format, pairings, matches, seed, start = chunk
+    if matches is None:
+        return [match_win_probability_from_chances(chance_1, chance_2, match_format) for chance_1, chance_2 in pairings]
+
+    from player import Player
+    from vectorized import simulate_matches
+    probabilities = []
+    for offset, (chance_1, chance_2) in enumerate(pairings):
+        # Keyed on the cell, so a cell gets the same estimate whichever worker runs it
+        rng = numpy_stream(seed, start + offset)
+        result = simulate_matches(Player("", chance_1), Player("", chance_2), matches, rng = rng,
+                                  match_format = match_format)
+        probabilities.append(result.win_probability())
+    return probabilities
+
+def sweep(chances_1, chances_2, formats=(CLASSIC,), matches=None, seed=None, workers=None, chunk_size=1000):
+    """
+    Work out the match-win probability for every pair of chances and every format.
+
+    Parameters:
+    chances_1 (list): The chance_to_win values of the player serving first.
+    chances_2 (list): The chance_to_win values of the other player.
+    formats (list, optional): The match formats, see scoring.py.
+    matches (int, optional): Simulate this many matches per cell instead of solving
+    exactly. Only needed to check the exact solver.
+    seed (int, optional): Seed for the simulated matches. The same seed gives the same
+    grid for any number of workers.
+    workers (int, optional): Number of worker processes. Defaults to one per core, 1
+    works in this process.
+    chunk_size (int, optional): Number of cells sent to a worker at a time.
+
+    Returns:
+    ndarray: grid[f, i, j] is the chance that chances_1[i] beats chances_2[j] serving
+    first, under formats[f].
+
+    Raises:
+    ValueError: If a chance is not in (0, 1].
+    """
+    chances_1 = np.asarray(chances_1, dtype = float)
+    chances_2 = np.asarray(chances_2, dtype = float)
+    for chances in (chances_1, chances_2):
+        if chances.size and (chances.min() <= 0 or chances.max() > 1):
+            raise ValueError("Every chance_to_win must be above 0 and at most 1.")
+    if matches is not None and seed is None:
+        seed = new_root_seed()
+
+    # Cells with the same ratio have the same answer. Rounding merges ratios that
+    # only differ in the last bits, like 0.5 / 0.6 and 0.75 / 0.9
+    ratios = np.round(chances_1[:, None] / chances_2[None, :], 12)
+    unique, first_cell, inverse = np.unique(ratios, return_index = True, return_inverse = True)
+    rows, columns = np.unravel_index(first_cell, ratios.shape)
+    pairings = list(zip(chances_1[rows].tolist(), chances_2[columns].tolist()))
+
+    chunks = []
+    for format_index, match_format in enumerate(formats):
+        for start in range(0, len(pairings), chunk_size):
+            chunks.append((match_format, pairings[start:start + chunk_size], matches, seed,
+                           format_index * len(pairings) + start))
+
+    values = []
+    if workers == 1:
+        for chunk_values in map(evaluate_chunk, chunks):
+            values.extend(chunk_values)
+    else:
+        with ProcessPoolExecutor(max_workers = workers) as executor:
+            for chunk_values in executor.map(evaluate_chunk, chunks):
+                values.extend(chunk_values)
+
+    values = np.array(values).reshape(len(formats), len(unique))
+    return values[:, inverse.reshape(ratios.shape)]
+
+def save_grid(filename, grid, chances_1, chances_2, format_names):
+    """
+    Save a sweep as a .npy array or as a CSV matrix per format.
+
+    The CSV has a header row with the chances of the second player. Every other row
+    starts with the format name and the chance of the first player.
+
+    Parameters:
+    filename (str): Ends in .csv for CSV, anything else is saved with numpy.save.
+    grid (ndarray): The result of sweep().
+    chances_1 (list): The chance_to_win values of the player serving first.
+    chances_2 (list): The chance_to_win values of the other player.
+    format_names (list): The name of every format, in the order of the grid.
+    """
+    if not filename.endswith(".csv"):
+        np.save(filename, grid)
+        return
+    with open(filename, "w", newline = "") as file:
+        writer = csv.writer(file)
+        writer.writerow(["format", "chance_1"] + [f"{chance:g}" for chance in chances_2])
+        for name, matrix in zip(format_names, grid):
+            for chance, row in zip(chances_1, matrix):
+                writer.writerow([name, f"{chance:g}"] + [f"{value:.6f}" for value in row])
@@ -0,0 +1,131 @@
+'''
+Struct-of-arrays containers for large rosters and many match states.
+
+Each column is a typed array, so an entry costs a few bytes per field instead
+of a whole Python object.
+'''
+
+from array import array
+from player import Player
+from match import STATE_FORMAT
+
+class PlayerTable:
+    '''A roster stored as one typed array per statistic.'''
+    __slots__ = ("names", "index", "chance_to_win", "wins", "losses")
+
+    def __init__(self):
+        """Initialize an empty PlayerTable."""
+        self.names = []  # Player names, in the order they were added
+        self.index = {}  # Player name -> row
+        self.chance_to_win = array("d")
+        self.wins = array("L")
+        self.losses = array("L")
+
+    @classmethod
+    def from_players(cls, players):
+        """
+        Build a table from Player instances.
+
+        Parameters:
+        players (iterable): The players to add, for example iter_players_file().
+
+        Returns:
+        PlayerTable: The filled table.
+        """
+        table = cls()
+        for player in players:
+            table.append(player.name, player.chance_to_win, player.wins, player.losses)
+        return table
+
+    def append(self, name, chance_to_win, wins=0, losses=0):
+        """
+        Add a player as a new row.
+
+        Parameters:
+        name (str): The player's name.
+        chance_to_win (float): Probability of winning a point (0.0 to 1.0).
+        wins (int, optional): Number of matches won. Defaults to 0.
+        losses (int, optional): Number of matches lost. Defaults to 0.
+
+        Returns:
+        int: The row of the new player.
+        """
+        if name in self.index:
+            raise ValueError(f"A player named {name} already exists.")
+        self.index[name] = len(self.names)
+        self.names.append(name)
+        self.chance_to_win.append(chance_to_win)
+        self.wins.append(wins)
+        self.losses.append(losses)
+        return self.index[name]
+
+    def add_result(self, winner, loser):
+        """
+        Record a finished match.
+
+        Parameters:
+        winner (int): The row of the player who won.
+        loser (int): The row of the player who lost.
+        """
+        self.wins[winner] += 1
+        self.losses[loser] += 1
+
+    def win_rate(self, row):
+        """
+        Return the win rate of a row as a percentage, rounded to 2 decimals.
+        """
+        played = self.wins[row] + self.losses[row]
+        if played > 0:
+            return round(100 * self.wins[row] / played, 2)
+        return 0.0  # No matches played yet, win rate is 0%
+
+    def player(self, row):
+        """
+        Return a Player instance with the values of a row.
+
+        Parameters:
+        row (int): The row to read.
+        """
+        return Player(self.names[row], self.chance_to_win[row], self.wins[row], self.losses[row])
+
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self):
+        for row in range(len(self.names)):
+            yield self.player(row)
+
+class MatchStateTable:
+    '''Many match scores packed back to back in a single bytearray.'''
+    __slots__ = ("data",)
+
+    def __init__(self):
+        """Initialize an empty MatchStateTable."""
+        self.data = bytearray()
+
+    def append(self, match):
+        """
+        Store the current score of a match.
+
+        Parameters:
+        match (Match): The match to store.
+
+        Returns:
+        int: The row of the stored state.
+        """
+        self.data += match.pack_state()
+        return len(self) - 1
+
+    def load(self, row, match):
+        """
+        Restore a stored score into a match.
+
+        Parameters:
+        row (int): The row to read.
+        match (Match): The match to restore the score into.
+        """
+        start = row * STATE_FORMAT.size
+        match.unpack_state(bytes(self.data[start:start + STATE_FORMAT.size]))
+
+    def __len__(self):
+        return len(self.data) // STATE_FORMAT.size
@@ -4,35 +4,41 @@ Tennis match simulation and statistic viewer
 Made by Tage Hermansson
 '''
 
-import tkinter as tk
-import ui
-from player import Player
+import time
+STARTED = time.perf_counter()  # When the module started loading, for the startup benchmark
+
+import argparse
+import math
+import os
+import random
+from player import iter_players_file, top_players
+from store import PlayerStore, open_store
 from match import Match
+from scoring import FORMATS
+
+# Modules that only some commands need (tkinter, ui, season, calibration, instrumentation, numpy)
+# are imported inside those commands, so the window and every command start quickly
 
-def import_players():
+def import_players(top_k=None, use_mmap=False):
     '''
     Imports players from the text file 'players.txt'.
 
     Reads the file line by line to create Player objects with their
     name, chance to win a serve, wins, and losses.
-    '''
-    players = []
 
+    Parameters:
+    top_k (int, optional): Only keep the top_k players by win rate.
+    use_mmap (bool, optional): Memory-map the file while reading it.
+    '''
     try:
-        with open("players.txt", "r") as file:
-            name = file.readline().strip()
-            # Read player data until the end of the file
-            while name:
-                chance_to_win = float(file.readline().strip())
-                wins = int(file.readline().strip())
-                losses = int(file.readline().strip())
-                player = Player(name, chance_to_win, wins, losses)
-                players.append(player)
-                name = file.readline().strip()  # Read next name or terminate the loop
+        players = iter_players_file("players.txt", use_mmap)  # Read lazily, the file is opened here
+        if top_k is not None:
+            return top_players(players, top_k)
+        return sorted(players, reverse = True)
     except FileNotFoundError:
         print("Error: File not found.")
 
-    return sorted(players, reverse = True)
+    return []
 
 def print_players(players):
     '''
@@ -43,7 +49,7 @@ def print_players(players):
     '''
 
     index = 1
-    for player in sorted(players):
+    for player in sorted(players, reverse = True):  # Best win rate first
         print(f"{index}. {player}")
         index += 1
 
@@ -86,16 +92,323 @@ def menu():
         "Write here: "
     )
 
-def main():
+def find_player(store, name):
     '''
-    The main function - a control loop for the program, displaying the menu
-    and executing user choices until the user chooses to quit.
+    Looks up a player in the store or stops with an error message.
+
+    Parameters:
+    store (PlayerStore): The player store.
+    name (str): The player's name.
+
+    Returns:
+    Player: The stored player.
+    '''
+    player = store.get(name)
+    if player is None:
+        raise SystemExit(f"Error: No player named {name}.")
+    return player
+
+def match_count(text):
+    '''
+    Reads a number of matches from the command line, like 10000 or 1e6.
+
+    Parameters:
+    text (str): The value given on the command line.
+
+    Returns:
+    int: The number, at least 1.
+    '''
+    try:
+        value = int(float(text))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"'{text}' is not a number")
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, not {text}")
+    return value
+
+def simulate_command(args):
     '''
-    choice = ""  # Initialize variable to track user choice
-    players = import_players()  # Load players from file
+    Simulates n matches between two stored players and prints the odds and scorelines.
+    The results are not saved.
+    '''
+    store = open_store(args.store)
+    player_1 = find_player(store, args.player_1)
+    player_2 = find_player(store, args.player_2)
+    store.close()
+    match_format = FORMATS[args.format]
+
+    try:
+        from vectorized import simulate_matches
+        result = simulate_matches(player_1, player_2, args.n, seed = args.seed, match_format = match_format)
+        wins = int((result.winners == 0).sum())
+        scorelines = result.scoreline_distribution()
+    except ImportError:  # No NumPy, play the matches one at a time
+        rng = random.Random(args.seed)
+        counts = {}
+        wins = 0
+        for _ in range(args.n):
+            match = Match([player_1, player_2], rng, match_format = match_format)
+            match_result = match.play()
+            wins += match_result.winner == 0
+            scoreline = (match.calculate_sets_won(0), match.calculate_sets_won(1))
+            counts[scoreline] = counts.get(scoreline, 0) + 1
+        scorelines = {scoreline: count / args.n for scoreline, count in counts.items()}
+
+    chance = wins / args.n
+    spread = 1.96 * math.sqrt(chance * (1 - chance) / args.n)
+    print(f"{player_1.name} beats {player_2.name} in {chance:.4%} of {args.n:,} matches "
+          f"(95% CI {chance - spread:.4%} - {chance + spread:.4%})")
+    for (sets_1, sets_2), share in sorted(scorelines.items(), key = lambda item: item[1], reverse = True):
+        print(f"{sets_1}-{sets_2}: {share:.2%}")
+
+def season_command(args):
+    '''
+    Plays a round-robin season between all stored players and saves the results.
+    '''
+    if os.path.exists(args.checkpoint):
+        raise SystemExit(f"Error: {args.checkpoint} holds an interrupted season. Run the resume command "
+                         "to finish it, or delete the file to start a new one.")
+    play_season(args, args.rounds, args.seed)
+
+def forecast_command(args):
+    '''
+    Plays a knockout tournament between the best stored players many times and prints
+    how often each player reached every round.
+    '''
+    if os.path.exists(args.checkpoint):
+        raise SystemExit(f"Error: {args.checkpoint} holds an interrupted forecast. Run the resume command "
+                         f"with --checkpoint {args.checkpoint} to finish it, or delete the file to start a new one.")
+    play_forecast(args, args.players, args.n, args.seed)
+
+def resume_command(args):
+    '''
+    Finishes an interrupted season or forecast from its checkpoint, with the same results it would have had.
+    '''
+    from checkpoint import read_header
+    try:
+        header = read_header(args.checkpoint)
+    except FileNotFoundError:
+        raise SystemExit(f"Error: There is no checkpoint at {args.checkpoint}.")
+    settings = header.get("settings", {})
+    if header.get("kind") == "season":
+        print(f"Resuming the season after {header['completed']} matches")
+        play_season(args, settings["rounds"], settings["seed"])
+    elif header.get("kind") == "forecast":
+        print(f"Resuming the forecast after {header['completed']} tournaments")
+        play_forecast(args, settings["players"], settings["n"], settings["seed"])
+    else:
+        raise SystemExit(f"Error: {args.checkpoint} is not a season or forecast checkpoint.")
+
+def play_season(args, rounds, seed):
+    '''
+    Plays a season with progress saved to args.checkpoint, then saves the results.
+    '''
+    from season import simulate_season
+    store = open_store(args.store)
+    players = store.load_players()
+    if len(players) < 2:
+        raise SystemExit("Error: A season needs at least two players.")
+    try:
+        season = simulate_season(players, rounds, seed, args.workers, checkpoint = args.checkpoint)
+    except ValueError as error:  # The checkpoint is for other players or chances
+        raise SystemExit(f"Error: {error}")
+    from checkpoint import read_header
+    run = read_header(args.checkpoint)["run"]
+    deltas = {player.name: record for player, record in zip(season.players, season.records())}
+    # The whole season is saved in one transaction, marked with the run id. If an earlier
+    # attempt got that far but crashed before removing the checkpoint, nothing is added twice
+    if not store.apply_deltas(deltas, run):
+        print("The season's results were already saved")
+    os.remove(args.checkpoint)
+    print(f"Season over: {len(season.fixtures)} matches played")
+    if args.calibrate:
+        from calibration import calibrate_season
+        before = [player.chance_to_win for player in players]
+        calibrate_season(season, store)
+        change = sum(abs(player.chance_to_win - chance) for player, chance in zip(players, before)) / len(players)
+        print(f"Refitted chance_to_win of {len(players)} players to the results (mean change {change:.4f})")
+    print_players(top_players(store.iter_players(), 10))
+    store.close()
+
+def play_forecast(args, players, n, seed):
+    '''
+    Plays a forecast with progress saved to args.checkpoint, prints it and removes the checkpoint.
+    '''
+    from bracket import seeded_draw, simulate_forecast
+    store = open_store(args.store)
+    draw = seeded_draw(top_players(store.iter_players(), players))
+    store.close()
+    if len(draw) < 2:
+        raise SystemExit("Error: A tournament needs at least two players.")
+    try:
+        forecast = simulate_forecast(draw, n, seed, checkpoint = args.checkpoint)
+    except ValueError as error:  # The checkpoint is for other players or chances
+        raise SystemExit(f"Error: {error}")
+    print(forecast)
+    os.remove(args.checkpoint)  # Like a season, the checkpoint goes once the results are out
+
+def sweep_command(args):
+    '''
+    Works out the match-win probability over a grid of chance_to_win values and saves it.
+    '''
+    from sweep import parse_chances, save_grid, sweep
+    formats = [FORMATS[name] for name in args.format]
+    try:
+        chances_1 = parse_chances(args.chances)
+        if args.against == "roster":  # Every stored player as the opponent
+            store = open_store(args.store)
+            chances_2 = [player.chance_to_win for player in store.iter_players()]
+            store.close()
+        else:
+            chances_2 = parse_chances(args.against or args.chances)
+        grid = sweep(chances_1, chances_2, formats, args.matches, args.seed, args.workers)
+    except ValueError as error:
+        raise SystemExit(f"Error: {error}")
+    save_grid(args.output, grid, chances_1, chances_2, args.format)
+    print(f"Saved {len(args.format)} x {len(chances_1)} x {len(chances_2)} win probabilities to {args.output}")
+
+def leaderboard_command(args):
+    '''
+    Prints the best players by win rate.
+    '''
+    store = open_store(args.store)
+    print_players(top_players(store.iter_players(), args.top))
+    store.close()
+
+def import_command(args):
+    '''
+    Copies the players in a 'players.txt' style file into the store.
+    '''
+    store = PlayerStore(args.store)
+    try:
+        count = store.migrate_from_text(args.filename)
+    except FileNotFoundError:
+        raise SystemExit(f"Error: File {args.filename} not found.")
+    print(f"Imported {count} players from {args.filename} to {args.store}")
+    store.close()
+
+def run(exit_after_startup=False):
+    '''
+    Opens the menu window and runs it until it is closed.
+
+    Parameters:
+    exit_after_startup (bool, optional): Print how long it took to show the window and
+    close it straight away, for the startup benchmark.
+    '''
+    import tkinter as tk  # Only the window needs Tk, the commands run without a display
+    import ui
+    store = open_store()  # Indexed player store, migrated from 'players.txt' on first run
     root = tk.Tk()
-    menu = ui.MenuUI(root, players)
+    menu = ui.MenuUI(root, [], store)
+    menu.load_players(store.iter_players())  # Fills in the roster in the background while the window is open
+    if exit_after_startup:
+        def shown():
+            root.update_idletasks()
+            print(f"Window shown after {time.perf_counter() - STARTED:.4f} s")
+            root.destroy()
+        root.after(0, shown)
     root.mainloop()
+    menu.writeback.flush()  # Save results still buffered when the window closes
+
+def main(arguments=None):
+    '''
+    The main function - a control loop for the program, displaying the menu
+    and executing user choices until the user chooses to quit.
+
+    Parameters:
+    arguments (list, optional): Command line arguments. Defaults to sys.argv.
+    '''
+    # The profiling options are accepted before and after a command alike
+    profiling = argparse.ArgumentParser(add_help = False)
+    profiling.add_argument("--profile", action = "store_true", default = argparse.SUPPRESS,
+                           help = "count and time the hot paths and profile the run, in one process")
+    profiling.add_argument("--profile-output", metavar = "FILE", default = argparse.SUPPRESS,
+                           help = "where --profile dumps the raw stats (default profile.out)")
+
+    parser = argparse.ArgumentParser(parents = [profiling],
+                                     description = "Tennis match simulation and statistic viewer. "
+                                     "Without a command the menu window is opened.")
+    parser.add_argument("--exit-after-startup", action = "store_true", help = argparse.SUPPRESS)
+    commands = parser.add_subparsers(dest = "command")
+
+    simulate = commands.add_parser("simulate", parents = [profiling], help = "simulate many matches between two players")
+    simulate.add_argument("player_1", help = "name of the player serving first")
+    simulate.add_argument("player_2", help = "name of the other player")
+    simulate.add_argument("--n", type = match_count, default = 10000,
+                          help = "number of matches, e.g. 1e6 (default 10000)")
+    simulate.add_argument("--seed", type = int, help = "seed for reproducible results")
+    simulate.add_argument("--format", choices = list(FORMATS), default = "classic",
+                          help = "match rules (default classic: best of three advantage sets)")
+    simulate.set_defaults(handler = simulate_command)
+
+    season = commands.add_parser("season", parents = [profiling], help = "play a round-robin season and save the results")
+    season.add_argument("--rounds", type = int, default = 1, help = "times each pairing is played")
+    season.add_argument("--seed", type = int, help = "seed for reproducible results")
+    season.add_argument("--workers", type = int, help = "worker processes (default one per core)")
+    season.set_defaults(handler = season_command)
+
+    forecast = commands.add_parser("forecast", parents = [profiling],
+                                   help = "forecast a knockout tournament between the best players")
+    forecast.add_argument("--players", type = int, default = 64, help = "players in the draw (default 64)")
+    forecast.add_argument("--n", type = match_count, default = 1000,
+                          help = "number of tournaments played (default 1000)")
+    forecast.add_argument("--seed", type = int, help = "seed for reproducible results")
+    forecast.add_argument("--checkpoint", default = "forecast.checkpoint",
+                          help = "file the progress is saved to every few seconds (default forecast.checkpoint)")
+    forecast.set_defaults(handler = forecast_command)
+
+    resume = commands.add_parser("resume", parents = [profiling], help = "finish a season or forecast that was interrupted")
+    resume.add_argument("--workers", type = int, help = "worker processes (default one per core)")
+    resume.set_defaults(handler = resume_command)
+
+    for command in (season, resume):
+        command.add_argument("--calibrate", action = "store_true",
+                             help = "also refit every player's chance_to_win to the season's results")
+        command.add_argument("--checkpoint", default = "season.checkpoint",
+                             help = "file the progress is saved to every few seconds (default season.checkpoint)")
+
+    sweeper = commands.add_parser("sweep", parents = [profiling], help = "match-win probability over a grid of chance_to_win values")
+    sweeper.add_argument("--chances", default = "0.5:0.95:200",
+                         help = "chances of the player serving first, start:stop:count or a comma list "
+                         "(default 0.5:0.95:200)")
+    sweeper.add_argument("--against", help = "chances of the opponent in the same form, or 'roster' for "
+                         "every stored player (default the same as --chances)")
+    sweeper.add_argument("--format", choices = list(FORMATS), nargs = "+", default = ["classic"],
+                         help = "match rules, one grid per format (default classic)")
+    sweeper.add_argument("--matches", type = match_count,
+                         help = "simulate this many matches per cell instead of solving exactly")
+    sweeper.add_argument("--seed", type = int, help = "seed for reproducible simulated matches")
+    sweeper.add_argument("--workers", type = int, help = "worker processes (default one per core)")
+    sweeper.add_argument("--output", default = "sweep.npy", help = "a .npy or .csv file (default sweep.npy)")
+    sweeper.set_defaults(handler = sweep_command)
+
+    leaderboard = commands.add_parser("leaderboard", parents = [profiling], help = "print the best players by win rate")
+    leaderboard.add_argument("--top", type = int, default = 20, help = "number of players (default 20)")
+    leaderboard.set_defaults(handler = leaderboard_command)
+
+    importer = commands.add_parser("import", parents = [profiling], help = "copy players from a text file into the store")
+    importer.add_argument("filename", nargs = "?", default = "players.txt", help = "default players.txt")
+    importer.set_defaults(handler = import_command)
+
+    for command in (simulate, season, forecast, resume, sweeper, leaderboard, importer):
+        command.add_argument("--store", default = "players.db", help = "player database (default players.db)")
+
+    args = parser.parse_args(arguments)
+    handler = args.handler if args.command else lambda args: run(args.exit_after_startup)
+
+    if not getattr(args, "profile", False):
+        handler(args)
+        return
+
+    import instrumentation
+    if not args.command:
+        import ui  # Loaded first so the window gets instrumented too
+    if hasattr(args, "workers"):
+        args.workers = 1  # Worker processes aren't instrumented, so everything is played in this one
+    instrumentation.enable()
+    with instrumentation.profile(getattr(args, "profile_output", "profile.out")):
+        handler(args)
+    print(instrumentation.report())
 
 # Run the main function to start the program
 if __name__ == "__main__":
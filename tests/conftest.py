@@ -0,0 +1,8 @@
+'''
+The modules live at the top of the repository, next to tennis_game_main.py.
+'''
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,55 @@
+import os
+import pytest
+import season
+import tennis_game_main
+from player import Player
+from store import PlayerStore
+
+def make_store(filename):
+    store = PlayerStore(filename)
+    for index in range(50):  # 1225 matches, three chunks of 500
+        store.add(Player(f"A Player{index}", 0.5 + index * 0.005))
+    store.close()
+
+def stored(filename):
+    store = PlayerStore(filename)
+    rows = [(player.name, player.chance_to_win, player.wins, player.losses) for player in store.load_players()]
+    store.close()
+    return rows
+
+def test_resumed_season_saves_the_same_results(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    make_store("uninterrupted.db")
+    make_store("interrupted.db")
+    tennis_game_main.main(["season", "--seed", "7", "--workers", "1", "--store", "uninterrupted.db"])
+    assert not os.path.exists("season.checkpoint")
+
+    # Stop the season after its first chunk, as if the run was killed
+    play_chunk = season.play_chunk
+    played = []
+
+    def interrupted(chunk):
+        if played:
+            raise KeyboardInterrupt
+        played.append(chunk)
+        return play_chunk(chunk)
+
+    monkeypatch.setattr(season, "play_chunk", interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        tennis_game_main.main(["season", "--seed", "7", "--workers", "1", "--store", "interrupted.db"])
+    monkeypatch.setattr(season, "play_chunk", play_chunk)
+    assert os.path.exists("season.checkpoint")
+    assert all(wins == losses == 0 for name, chance, wins, losses in stored("interrupted.db"))
+
+    tennis_game_main.main(["resume", "--workers", "1", "--store", "interrupted.db"])
+    assert not os.path.exists("season.checkpoint")
+    assert stored("interrupted.db") == stored("uninterrupted.db")
+
+def test_results_of_a_run_are_only_saved_once(tmp_path):
+    store = PlayerStore(str(tmp_path / "players.db"))
+    store.add(Player("A Player", 0.6))
+    assert store.apply_deltas({"A Player": (3, 1)}, "run")
+    assert not store.apply_deltas({"A Player": (3, 1)}, "run")
+    player = store.get("A Player")
+    store.close()
+    assert (player.wins, player.losses) == (3, 1)
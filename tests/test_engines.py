@@ -0,0 +1,62 @@
+import math
+import random
+import pytest
+from exact import match_win_probability_from_chances
+from live import LiveOdds
+from match import Match, simulate_match
+from player import Player
+from scoring import FORMATS
+from vectorized import simulate_matches
+
+CHANCE_1 = 0.62
+CHANCE_2 = 0.6
+
+def within(estimate, expected, n, sigmas=4):
+    """True if a share of n matches is within a few standard errors of the expected chance."""
+    return abs(estimate - expected) <= sigmas * math.sqrt(expected * (1 - expected) / n)
+
+@pytest.mark.parametrize("name", list(FORMATS))
+def test_batch_engine_agrees_with_exact_solver(name):
+    match_format = FORMATS[name]
+    expected = match_win_probability_from_chances(CHANCE_1, CHANCE_2, match_format)
+    n = 40000
+    result = simulate_matches(Player("A", CHANCE_1), Player("B", CHANCE_2), n, seed = 1, match_format = match_format)
+    assert within(result.win_probability(), expected, n)
+    assert (result.sets_won.max(axis = 1) == match_format.sets_to_win).all()
+
+@pytest.mark.parametrize("name", list(FORMATS))
+def test_scalar_engine_agrees_with_exact_solver(name):
+    match_format = FORMATS[name]
+    expected = match_win_probability_from_chances(CHANCE_1, CHANCE_2, match_format)
+    rng = random.Random(2)
+    n = 2000
+    wins = sum(simulate_match(Player("A", CHANCE_1), Player("B", CHANCE_2), rng = rng,
+                              match_format = match_format).winner == 0 for _ in range(n))
+    assert within(wins / n, expected, n)
+
+@pytest.mark.parametrize("name", list(FORMATS))
+def test_antithetic_batch_agrees_with_exact_solver(name):
+    match_format = FORMATS[name]
+    expected = match_win_probability_from_chances(CHANCE_1, CHANCE_2, match_format)
+    n = 40000
+    result = simulate_matches(Player("A", CHANCE_1), Player("B", CHANCE_2), n, seed = 3, antithetic = True,
+                              match_format = match_format)
+    assert within(result.win_probability(), expected, n)
+
+@pytest.mark.parametrize("name", list(FORMATS))
+def test_live_odds_start_at_the_exact_chance_and_end_at_the_result(name):
+    match_format = FORMATS[name]
+    odds = LiveOdds(CHANCE_1, CHANCE_2, match_format)
+    match = Match([Player("A", CHANCE_1), Player("B", CHANCE_2)], random.Random(4), match_format = match_format)
+    assert odds.win_probability(match) == pytest.approx(match_win_probability_from_chances(CHANCE_1, CHANCE_2, match_format))
+    while not match.is_over():
+        match.play_point()
+        assert 0 <= odds.win_probability(match) <= 1
+    assert odds.win_probability(match) == (1.0 if match.winner() == 0 else 0.0)
+
+def test_batch_engine_is_reproducible():
+    player_1, player_2 = Player("A", CHANCE_1), Player("B", CHANCE_2)
+    first = simulate_matches(player_1, player_2, 1000, seed = 5)
+    second = simulate_matches(player_1, player_2, 1000, seed = 5)
+    assert (first.winners == second.winners).all()
+    assert (first.point_counts == second.point_counts).all()
@@ -0,0 +1,25 @@
+import instrumentation
+import tennis_game_main
+from player import Player
+from store import PlayerStore
+
+def test_profiled_season_counts_points(tmp_path, monkeypatch, capsys):
+    """The matches of a profiled season are played where the counters can see them."""
+    monkeypatch.chdir(tmp_path)
+    store = PlayerStore("players.db")
+    for index in range(6):
+        store.add(Player(f"A Player{index}", 0.5 + index * 0.05))
+    store.close()
+
+    try:
+        tennis_game_main.main(["--profile", "--profile-output", "profile.out",
+                               "season", "--seed", "1", "--workers", "4"])
+    finally:
+        instrumentation.disable()
+    counters = instrumentation.snapshot()["counters"]
+    instrumentation.reset()
+
+    assert counters.get("points", 0) > 0
+    assert counters.get("games", 0) > 0
+    assert counters.get("sets", 0) > 0
+    assert "points" in capsys.readouterr().out
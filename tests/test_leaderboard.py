@@ -0,0 +1,38 @@
+import random
+from leaderboard import Leaderboard
+from player import Player
+
+def test_rank_and_pages_match_a_full_sort():
+    rng = random.Random(1)
+    players = [Player(f"P{index}", 0.5, rng.randint(0, 20), rng.randint(0, 20)) for index in range(3000)]
+    leaderboard = Leaderboard(players)
+    assert len(leaderboard.buckets) > 1  # The roster is large enough to be split
+    try:
+        for _ in range(20000):
+            player = rng.choice(players)
+            if rng.random() < 0.5:
+                player.add_win()
+            else:
+                player.add_loss()
+
+        expected = sorted(players, key = Leaderboard.key)
+        assert leaderboard.page(0, len(players)) == expected
+        assert leaderboard.page(1234, 20) == expected[1234:1254]
+        for rank, player in enumerate(expected, 1):
+            assert leaderboard.rank(player) == rank
+    finally:
+        leaderboard.close()
+
+def test_removed_and_unknown_players_are_ignored():
+    players = [Player(f"P{index}", 0.5) for index in range(10)]
+    leaderboard = Leaderboard(players)
+    outsider = Player("Outsider", 0.5)
+    try:
+        leaderboard.remove(players[0])
+        players[0].add_win()
+        outsider.add_win()
+        assert len(leaderboard) == 9
+        assert players[0] not in leaderboard.page(0, 10)
+        assert outsider not in leaderboard.page(0, 10)
+    finally:
+        leaderboard.close()
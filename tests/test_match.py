@@ -0,0 +1,64 @@
+import random
+import pytest
+from match import Match
+from matchlog import MatchLog, MatchLogWriter
+from player import Player
+from scoring import FORMATS, MatchFormat
+from table import MatchStateTable
+
+def players():
+    return [Player("A", 0.62), Player("B", 0.6)]
+
+@pytest.mark.parametrize("name", list(FORMATS))
+def test_pack_and_unpack_round_trip_every_point(name):
+    match_format = FORMATS[name]
+    match = Match(players(), random.Random(1), match_format = match_format)
+    copy = Match(players(), match_format = match_format)
+    while not match.is_over():
+        match.play_point()
+        copy.unpack_state(match.pack_state())
+        assert copy.pack_state() == match.pack_state()
+        assert copy.sets == match.sets
+        assert copy.games == match.games
+        assert copy.point_labels() == match.point_labels()
+
+def test_match_state_table_keeps_every_row():
+    table = MatchStateTable()
+    match = Match(players(), random.Random(2))
+    states = []
+    while not match.is_over():
+        match.play_point()
+        states.append(match.pack_state())
+        table.append(match)
+    restored = Match(players())
+    for row, state in enumerate(states):
+        table.load(row, restored)
+        assert restored.pack_state() == state
+
+@pytest.mark.parametrize("best_of", [0, 2, 7])
+def test_formats_that_dont_fit_the_packed_state_are_rejected(best_of):
+    with pytest.raises(ValueError):
+        MatchFormat(best_of = best_of)
+
+@pytest.mark.parametrize("name", list(FORMATS))
+def test_match_log_replays_every_point(tmp_path, name):
+    match_format = FORMATS[name]
+    filename = str(tmp_path / "matches")
+    with MatchLogWriter(filename) as writer:
+        recorded = [writer.record(*players(), seed = seed, match_format = match_format) for seed in range(3)]
+
+    with MatchLog(filename) as log:
+        assert len(log) == len(recorded)
+        for index, match in enumerate(recorded):
+            assert log.entry(index)[2:] == (0.62, 0.6)
+            replayed = log.replay(index, match_format = match_format)
+            assert replayed.is_over()
+            assert replayed.winner() == match.winner()
+            assert replayed.pack_state() == match.pack_state()
+
+            # Part of the way through, the replay has the score the match had then
+            points = len(match.log) // 2
+            original = Match(players(), random.Random(index), match_format = match_format)
+            for _ in range(points):
+                original.play_point()
+            assert log.replay(index, points, match_format = match_format).pack_state() == original.pack_state()
@@ -1,26 +1,42 @@
 from player import Player
 from tkinter import ttk
 from match import Match
+from scoring import CLASSIC
+from writeback import StatWriteBack
+from leaderboard import Leaderboard
+from odds import OddsCache
+from live import live_odds
 import tkinter as tk
+from collections import deque
+import queue
 import threading
 import time
 
 class MenuUI:
     '''Represents a menu UI where the user can interact with the program.'''
-    def __init__(self, root, players):
+    def __init__(self, root, players, store=None):
         """
         Initialize a new Menu instance.
         
         Parameters:
         all_players (list): A list of all Player instances.
+        store (PlayerStore, optional): Where player stats are saved. Defaults to 'players.txt'.
         """
 
         # Sets up a window
         self.root = root
         self.players = players
+        self.players_by_name = {player.name: player for player in players}  # Kept up to date by add_players
+        self.player_names = list(self.players_by_name)
+        self.store = store
+        self.writeback = StatWriteBack(store if store is not None else "players.txt")  # Buffers match results until flushed
         self.root.title("Tennis Match Simulator")
         self.root.geometry("800x400")
-        self.player_labels = []
+        self.leaderboard = Leaderboard(players)  # Stays sorted as players win and lose
+        self.page = 0
+        self.page_size = 20
+        self.player_label = None
+        self.odds = OddsCache()  # Pre-match odds for the selected players
 
         # It's here because the players apparently needs to be initialized
         self.selected_players = [Player("", 0), Player("", 0)]
@@ -37,6 +53,7 @@ class MenuUI:
                 self.selected_players[1] = self.map_players().get(selection2, None)
 
             print(f"{selection1} vs {selection2}")
+            self.show_odds()
 
         # Creates the dropdown menus
         self.dropdown_1 = ttk.Combobox(values = self.get_player_names())
@@ -47,6 +64,10 @@ class MenuUI:
         self.dropdown_2.bind("<<ComboboxSelected>>", selection_changed)
         self.dropdown_2.place(x = 250, y = 200)
 
+        # Shows the odds of the selected players
+        self.odds_label = tk.Label(root, text = "", font = ("Arial", 12))
+        self.odds_label.place(x = 50, y = 230)
+
         # Create Match button
         self.start_button = tk.Button(root, text = "Create Match", command = self.create_match, font=("Arial", 12))
         self.start_button.grid(row = 4, column = 0, padx = 10, pady = 10)
@@ -55,6 +76,19 @@ class MenuUI:
         self.show_button = tk.Button(root, text = "Show Stats", command = self.create_player_labels, font=("Arial", 12))
         self.show_button.grid(row = 5, column = 0, padx = 10, pady = 10)
 
+        # Simulate season button
+        self.season_button = tk.Button(root, text = "Simulate Season", command = self.simulate_season, font = ("Arial", 12))
+        self.season_button.grid(row = 5, column = 1, padx = 10, pady = 10)
+
+        # Refit the chances to the season's results, off unless asked for
+        self.calibrate = tk.BooleanVar(root, value = False)
+        self.calibrate_button = tk.Checkbutton(root, text = "Refit chances", variable = self.calibrate, font = ("Arial", 12))
+        self.calibrate_button.grid(row = 5, column = 2, padx = 10, pady = 10)
+
+        # Tournament button
+        self.tournament_button = tk.Button(root, text = "Tournament", command = self.create_tournament, font = ("Arial", 12))
+        self.tournament_button.grid(row = 4, column = 1, padx = 10, pady = 10)
+
         # Creates add player button
         self.add_player_button = tk.Button(root, text = "Add Player", command = self.add_player, font = ("Arial", 12))
         self.add_player_button.grid(row = 6, column = 0, padx = 10, pady = 10)
@@ -64,25 +98,81 @@ class MenuUI:
         self.add_player_button.grid(row = 6, column = 1, padx = 10, pady = 10)
     
     def get_player_names(self):
-        return list(self.map_players())
+        return self.player_names
     
     def map_players(self):
-        return {player.name: player for player in self.players}
+        return self.players_by_name
     
     def config_dropdowns(self):
-        self.dropdown_1.config(values = self.get_player_names())
-        self.dropdown_2.config(values = self.get_player_names())
+        self.dropdown_1.config(values = self.player_names)
+        self.dropdown_2.config(values = self.player_names)
+
+    def add_players(self, players):
+        """
+        Add players to the roster, the leaderboard and the cached names.
+
+        The dropdowns aren't updated, call config_dropdowns once the roster is complete.
+
+        Parameters:
+        players (list): The new Player instances.
+        """
+        for player in players:
+            self.players.append(player)
+            self.players_by_name[player.name] = player
+            self.player_names.append(player.name)
+            self.leaderboard.add(player)
+
+    def load_players(self, players, batch_size=500):
+        """
+        Read players in a background thread and add them to the menu without blocking the window.
+
+        Parameters:
+        players (iterator): Yields the Player instances to add, for example PlayerStore.iter_players().
+        batch_size (int, optional): Number of players handed to the Tk thread at a time.
+        """
+        batches = queue.Queue()
+
+        def read():
+            batch = []
+            for player in players:
+                batch.append(player)
+                if len(batch) == batch_size:
+                    batches.put(batch)
+                    batch = []
+            batches.put(batch)
+            batches.put(None)  # The roster is complete
+
+        threading.Thread(target = read, daemon = True).start()
+        self.root.after(1, self.receive_players, batches)
+
+    def receive_players(self, batches):
+        """Add the batches read so far and fill in the dropdowns once the last one has arrived. Runs in the Tk thread."""
+        while not batches.empty():
+            batch = batches.get()
+            if batch is None:
+                self.config_dropdowns()
+                return
+            self.add_players(batch)
+        self.root.after(10, self.receive_players, batches)
     
+    def show_odds(self):
+        '''Shows the chance of each selected player winning, player 1 serving first.'''
+        player_1, player_2 = self.selected_players
+        if player_1 is None or player_2 is None or not player_1.name or not player_2.name or player_1 is player_2:
+            self.odds_label.config(text = "")
+            return
+        chance = self.odds.win_probability(player_1, player_2)
+        self.odds_label.config(text = f"{player_1.name} {chance:.1%} - {1 - chance:.1%} {player_2.name}")
+
     def create_match(self):
         '''Creates match between selected players.'''
         # Checks if two players are chosen
         if len(self.selected_players[0].name) > 0 and len(self.selected_players[1].name) > 0:
             if self.selected_players[0] != self.selected_players[1]:
                 # Code to create match
-                match = Match(self.selected_players)
-                root = tk.Tk()
-                gui = GUI(root, match, 0.1)
-                root.mainloop()
+                match = Match(list(self.selected_players))
+                window = tk.Toplevel(self.root)  # Shares the menu's Tk interpreter and main loop
+                gui = GUI(window, match, 0.1, self.writeback)
             else:
                 print("ERROR: Nice try, you can't play against yourself")
         else:
@@ -90,7 +180,7 @@ class MenuUI:
 
     def create_player_labels(self):
         """
-        Dynamically creates labels for each player in the given list and adds them to the GUI.
+        Shows the current page of the leaderboard, reusing the same label every time.
         """
         # Define column widths
         name_width = 25
@@ -99,50 +189,129 @@ class MenuUI:
         win_rate_width = 10
 
         # Create a table header with alignment
-        header = (
-            f"{'Nr':<4}{'Name':<{name_width}}{'Wins':<{wins_width}}"
+        rows = [
+            f"{'Nr':<6}{'Name':<{name_width}}{'Wins':<{wins_width}}"
             f"{'Losses':<{losses_width}}{'Win Rate':<{win_rate_width}}"
-        )
-
-        # Initialize the table with the header
-        player_table = header
+        ]
 
-        # Add each player's data to the table
-        for index, player in enumerate(self.players):
-            player_table += (
-                f"\n{(index + 1):<4}{player.name:<{name_width}}"
+        # Only the visible players are formatted
+        first = self.page * self.page_size
+        for index, player in enumerate(self.leaderboard.page(first, self.page_size), first + 1):
+            rows.append(
+                f"{index:<6}{player.name:<{name_width}}"
                 f"{player.wins:<{wins_width}}{player.losses:<{losses_width}}"
                 f"{player.win_rate:<{win_rate_width}.1f}%"
             )
-
-        # Create a label for the table
-        player_label = tk.Label(self.root, text=player_table, justify="left", font=("Courier", 10), anchor="w")
-
-        # Place the label in the GUI
-        player_label.place(x=450, y=50)
-
+        player_table = "\n".join(rows)
+
+        if self.player_label is None:
+            # Create a label for the table and buttons to change page
+            self.player_label = tk.Label(self.root, text=player_table, justify="left", font=("Courier", 10), anchor="nw")
+            self.player_label.place(x=450, y=50)
+            self.previous_button = tk.Button(self.root, text = "<", command = lambda: self.change_page(-1))
+            self.previous_button.place(x=450, y=10)
+            self.next_button = tk.Button(self.root, text = ">", command = lambda: self.change_page(1))
+            self.next_button.place(x=490, y=10)
+        else:
+            self.player_label.config(text=player_table)
+
+    def change_page(self, step):
+        '''Moves the stats table a page forwards or backwards.'''
+        last_page = max(0, (len(self.leaderboard) - 1) // self.page_size)
+        self.page = min(max(self.page + step, 0), last_page)
+        self.create_player_labels()
+
+    def simulate_season(self):
+        '''Plays a round-robin season between all players in the background and saves the results.'''
+        if len(self.players) < 2:
+            print("ERROR: A season needs at least two players")
+            return
+        self.season_button.config(state = tk.DISABLED)  # One season at a time
+        players = list(self.players)
+        calibrate = self.store is not None and self.calibrate.get()  # Tk variables are only read in the Tk thread
+        results = queue.Queue()
+
+        def play():
+            # Only works out the results, the players and the store are changed in the Tk thread
+            try:
+                from season import simulate_season  # Loads the process pool only when a season is played
+                season = simulate_season(players, apply = False)
+                chances = None
+                if calibrate:
+                    try:
+                        from calibration import fit_season
+                        chances = fit_season(season)
+                    except ImportError:  # No NumPy, the chances stay as they are
+                        pass
+                results.put((season, chances))
+            except Exception as error:  # Handed to the Tk thread, which reports it
+                results.put((None, error))
+
+        threading.Thread(target = play, daemon = True).start()
+        self.root.after(100, self.receive_season, results)
+
+    def receive_season(self, results):
+        """Add the season's results to the players and save them once it is over. Runs in the Tk thread."""
+        if results.empty():
+            self.root.after(100, self.receive_season, results)
+            return
+        season, chances = results.get()
+        self.season_button.config(state = tk.NORMAL)
+        if season is None:
+            print(f"ERROR: The season failed: {chances}")
+            return
+        season.apply()
+        print(f"Season over: {len(season.fixtures)} matches played")
+        records = [(player, wins, losses) for player, (wins, losses) in zip(season.players, season.records())]
+        self.writeback.record_many(records)  # The whole season is saved in one write
+        if chances is not None:
+            for player, chance in zip(season.players, chances):
+                player.chance_to_win = chance
+            self.store.update_chances(season.players)
+            self.show_odds()  # The selected players' odds are looked up again for their new chances
+        self.create_player_labels()
     
     def add_player(self):
-        root = tk.Tk()
-        ui = AddPlayerUI(root, self)
-        root.mainloop
+        window = tk.Toplevel(self.root)
+        ui = AddPlayerUI(window, self)
+
+    def create_tournament(self):
+        '''Starts a knockout tournament between the 64 best players, shown live on one window.'''
+        if len(self.leaderboard) < 2:
+            print("ERROR: A tournament needs at least two players")
+            return
+        from bracket import seeded_draw, exact_forecast
+        draw = seeded_draw(self.leaderboard.page(0, 64))
+        print(exact_forecast(draw))  # Each player's chance to reach every round
+        window = tk.Toplevel(self.root)
+        tournament = TournamentUI(window, draw, self.writeback)
 
 class GUI:
     '''Represents the window for each match, displaying the score etc.'''
-    def __init__(self, root, match, interval):
+    def __init__(self, root, match, interval, writeback=None, replay=None):
         """
         Initialize a new GUI instance.
         
         Parameters:
         match (Match): The match which is to be simulated.
         interval (float): The interval (speed) of the match, where smaller = faster.
+        writeback (StatWriteBack, optional): Buffers the result. Defaults to saving straight to 'players.txt'.
+        replay (bytes, optional): Point bytes from a MatchLog to show instead of simulating.
+        A replayed result was already saved when it was played, so it isn't saved again.
         """
         # Sets basic variables
         self.match = match
         self.interval = interval
+        self.writeback = writeback
+        self.replay = iter(replay) if replay is not None else None
         self.running = False
         self.current_set = 0
 
+        # The simulation thread hands scores and events to the Tk thread through these
+        self.latest = deque(maxlen = 1)  # Only the newest score is kept
+        self.events = queue.Queue()
+        self.refresh_ms = 16  # Redraw at most about 60 times a second
+
         # Setup the GUI layout
         self.root = root
         self.root.title(f"{match.players[0].name} vs {match.players[1].name}")
@@ -156,7 +325,8 @@ class GUI:
 
         # Set and Point Displays
         self.set_labels = []
-        for i in range(3):  # Three sets
+        sets_in_match = match.format.best_of
+        for i in range(sets_in_match):  # One column per set
             set_label1 = tk.Label(root, text = "0", font = ("Arial", 14))
             set_label1.grid(row = 0, column=i + 1, padx = 10, pady = 10)
             set_label2 = tk.Label(root, text = "0", font = ("Arial", 14))
@@ -164,25 +334,51 @@ class GUI:
             self.set_labels.append([set_label1, set_label2])
 
         self.points_1_label = tk.Label(root, text = "0", font = ("Arial", 16))
-        self.points_1_label.grid(row = 0, column = 4, padx = 10, pady = 10)
+        self.points_1_label.grid(row = 0, column = sets_in_match + 1, padx = 10, pady = 10)
         self.points_2_label = tk.Label(root, text = "0", font = ("Arial", 16))
-        self.points_2_label.grid(row = 1, column = 4, padx = 10, pady = 10)
+        self.points_2_label.grid(row = 1, column = sets_in_match + 1, padx = 10, pady = 10)
 
         # Match Status
         self.status_label = tk.Label(root, text = "Match Ongoing", font = ("Arial", 14))
         self.status_label.grid(row = 3, column = 2, padx = 10, pady = 10)
 
+        # Live chance of each player winning, looked up in a table built once per pairing
+        self.live_odds = live_odds(match.players[0], match.players[1], match.format)
+        self.odds_label = tk.Label(root, text = "", font = ("Arial", 12))
+        self.odds_label.grid(row = 2, column = 0, columnspan = sets_in_match + 2, padx = 10, pady = 5)
+        self.update_display()
+
         # Control Buttons
         self.start_button = tk.Button(root, text = "Start Match", command = self.start_simulation, font = ("Arial", 12))
         self.start_button.grid(row = 4, column = 0, padx = 10, pady = 10)
 
-    def update_display(self):
-        """Update the GUI with the latest match state."""
-        for i in range(3):  # Update set scores
-            self.set_labels[i][0].config(text=self.match.sets[0][i])
-            self.set_labels[i][1].config(text=self.match.sets[1][i])
-        self.points_1_label.config(text=self.match.points[0])
-        self.points_2_label.config(text=self.match.points[1])
+    def update_display(self, snapshot=None):
+        """
+        Update the GUI with the latest match state.
+
+        Parameters:
+        snapshot (tuple, optional): Set scores, point labels and live odds made by take_snapshot.
+        Defaults to reading the match directly, which is only safe when it isn't running.
+        """
+        if snapshot is None:
+            snapshot = self.take_snapshot()
+        sets, points, chance = snapshot
+        for i in range(len(self.set_labels)):  # Update set scores
+            self.set_labels[i][0].config(text=sets[0][i])
+            self.set_labels[i][1].config(text=sets[1][i])
+        self.points_1_label.config(text=points[0])
+        self.points_2_label.config(text=points[1])
+        names = [player.name for player in self.match.players]
+        self.odds_label.config(text = f"Live odds: {names[0]} {chance:.1%} - {1 - chance:.1%} {names[1]}")
+
+    def take_snapshot(self):
+        """Copy the parts of the match state that are shown on screen, and the live odds."""
+        sets = (tuple(self.match.sets[0]), tuple(self.match.sets[1]))
+        return sets, self.match.point_labels(), self.live_odds.win_probability(self.match)
+
+    def publish(self):
+        """Hand the current score to the Tk thread, replacing any score it hasn't drawn yet."""
+        self.latest.append(self.take_snapshot())
     
     def update_players_in_file(self):
         '''Updates both players in the match.'''
@@ -190,58 +386,196 @@ class GUI:
             player.update_stats_in_file()
 
     def simulate_point(self):
-        """Simulate points live in the match."""
+        """Simulate points live in the match. Runs in its own thread and never touches Tk."""
         # Checks if the program should run
         while self.ongoing():
-            self.match.simulate_point(server = sum(self.match.games) % 2)
-            self.update_display()
+            if self.replay is None:
+                self.match.simulate_point(self.match.server())
+            else:
+                code = next(self.replay, None)
+                if code is None:  # The log ended before the match did
+                    self.stop_simulation()
+                    break
+                self.match.record_point(code >> 1, code & 1)
+            self.publish()
 
             # Checks if a game is over
-            if "Winner" in self.match.points:
-                winner = self.match.points.index("Winner")
+            winner = self.match.game_winner()
+            if winner is not None:
                 self.check_game_over(winner)
 
                 # Checks if the match is over
                 if self.match_over():
-                    self.status_label.config(text = f"{self.match.players[winner].name} Wins the Match!")
-                    self.match.players[winner].add_win()
-                    self.match.players[1 - winner].add_loss()
-                    self.update_players_in_file()
+                    self.publish()  # The final score is queued before the event, so it gets drawn
+                    self.events.put(("finished", winner))
                     self.stop_simulation()
             
-            self.update_display()
-            time.sleep(self.interval)
+            self.publish()
+            if self.interval > 0:
+                time.sleep(self.interval)
+
+    def poll(self):
+        """Draw the newest score and handle match events. Runs in the Tk thread."""
+        if self.latest:
+            self.update_display(self.latest.pop())
+
+        while not self.events.empty():
+            event, winner = self.events.get()
+            if event == "finished":
+                self.finish(winner)
+
+        if self.running or self.latest or not self.events.empty():
+            self.root.after(self.refresh_ms, self.poll)
+
+    def finish(self, winner):
+        """Show the winner and save the result."""
+        self.status_label.config(text = f"{self.match.players[winner].name} Wins the Match!")
+        if self.replay is not None:
+            return
+        if self.writeback is not None:
+            self.writeback.add_win(self.match.players[winner])
+            self.writeback.add_loss(self.match.players[1 - winner])
+        else:
+            self.match.players[winner].add_win()
+            self.match.players[1 - winner].add_loss()
+            self.update_players_in_file()
     
     def ongoing(self):
-        if self.running and self.current_set < 3:
-            return True
-        else:
-            return False
+        return self.running and not self.match.is_over()
     
     def check_game_over(self, winner):
-        if self.match.add_game(winner, self.current_set):  # Runs add_game code which checks if the set is won
-            self.current_set += 1  # Move onto next set
-            self.match.reset_games()
-            print(self.match.calculate_sets_won(0) - self.match.calculate_sets_won(1))  # Prints score for debugging
-        self.match.reset_points()
+        self.match.end_game(winner)  # Runs the game and set logic in the match
+        self.current_set = self.match.current_set
 
     def match_over(self):
-        diff = self.match.calculate_sets_won(0) - self.match.calculate_sets_won(1)
-        if self.current_set == 3 or (self.current_set == 2 and diff in (2, -2)):
-            return True
-        else:
-            return False
+        return self.match.is_over()
 
     def start_simulation(self):
         """Start the match simulation in a separate thread."""
         self.running = True
         self.start_button.destroy()
-        threading.Thread(target = self.simulate_point).start()
+        threading.Thread(target = self.simulate_point, daemon = True).start()
+        self.root.after(self.refresh_ms, self.poll)
 
     def stop_simulation(self):
         """Stop the match simulation."""
         self.running = False
 
+def replay_match(root, log, match_index, interval=0.05, players=None, match_format=CLASSIC):
+    """
+    Show a match from a match log point by point.
+
+    Parameters:
+    root (tk.Tk or tk.Toplevel): The window to draw in.
+    log (MatchLog): The log holding the match.
+    match_index (int): The index of the match in the log.
+    interval (float, optional): Seconds between points, 0 for as fast as possible.
+    players (list, optional): The two players. Defaults to stand-ins with the recorded chances.
+    match_format (MatchFormat, optional): The rules the match was played with.
+
+    Returns:
+    GUI: The match window. Press its start button to play the replay.
+    """
+    match = Match(players or log.players(match_index), match_format = match_format)
+    return GUI(root, match, interval, replay = log.point_codes(match_index))
+
+class TournamentUI:
+    '''Shows every match of a knockout tournament on one window, played by a single scheduler.'''
+    def __init__(self, root, draw, writeback=None, points_per_tick=1, tick_ms=16):
+        """
+        Initialize a new TournamentUI instance and start the first round.
+
+        Parameters:
+        root (tk.Toplevel): The window to draw the courts in.
+        draw (list): The players and byes (None) in draw order, as made by bracket.seeded_draw.
+        writeback (StatWriteBack, optional): Buffers the results. Defaults to not saving them.
+        points_per_tick (int, optional): Points played on every court per step.
+        tick_ms (int, optional): Milliseconds between steps of the scheduler.
+        """
+        self.root = root
+        self.writeback = writeback
+        self.points_per_tick = points_per_tick
+        self.tick_ms = tick_ms
+        self.round = 0
+        self.courts = []  # [match, label, position in the draw] for every match in the round
+
+        self.root.title("Tournament")
+        self.status_label = tk.Label(root, text = "", font = ("Arial", 14))
+        self.status_label.grid(row = 0, column = 0, columnspan = 4, padx = 5, pady = 5)
+        self.start_round(draw)
+        self.root.after(self.tick_ms, self.tick)
+
+    def start_round(self, draw):
+        """
+        Put neighbours in the draw on courts. Players facing a bye go straight through.
+
+        Parameters:
+        draw (list): The players left, in draw order.
+        """
+        for match, label, position in self.courts:
+            label.destroy()
+        self.round += 1
+        self.courts = []
+        self.byes = []  # Players through to the next round without a match, with their position
+        for i in range(len(draw) // 2):
+            first, second = draw[2 * i], draw[2 * i + 1]
+            if first is None or second is None:
+                self.byes.append((i, first or second))
+                continue
+            match = Match([first, second])
+            label = tk.Label(self.root, font = ("Courier", 9), justify = "left", anchor = "w")
+            label.grid(row = 1 + len(self.courts) // 4, column = len(self.courts) % 4, padx = 5, pady = 5, sticky = "w")
+            self.courts.append([match, label, i])
+            self.draw(match, label)
+        players_left = sum(player is not None for player in draw)
+        self.status_label.config(text = f"Round {self.round}: {players_left} players")
+
+    def draw(self, match, label):
+        """Write the score and live odds of a court into its label."""
+        points = match.point_labels()
+        chance = live_odds(match.players[0], match.players[1], match.format).win_probability(match)
+        lines = []
+        for i in range(2):
+            sets = " ".join(str(games) for games in match.sets[i])
+            player_chance = chance if i == 0 else 1 - chance
+            lines.append(f"{match.players[i].name[:16]:<17}{sets}  {points[i]:<4}{player_chance:6.1%}")
+        label.config(text = "\n".join(lines))
+
+    def tick(self):
+        """Play the next points on every unfinished court, then reschedule itself."""
+        for match, label, position in self.courts:
+            if match.is_over():
+                continue
+            for _ in range(self.points_per_tick):
+                match.play_point()
+                if match.is_over():
+                    self.record(match)
+                    break
+            self.draw(match, label)
+
+        if all(match.is_over() for match, label, position in self.courts):
+            # Winners keep their place in the draw for the next round
+            winners = [None] * (len(self.courts) + len(self.byes))
+            for position, player in self.byes:
+                winners[position] = player
+            for match, label, position in self.courts:
+                winners[position] = match.players[match.winner()]
+            if len(winners) == 1:
+                self.status_label.config(text = f"{winners[0].name} wins the tournament!")
+                if self.writeback is not None:
+                    self.writeback.flush()
+                return
+            self.start_round(winners)
+        self.root.after(self.tick_ms, self.tick)
+
+    def record(self, match):
+        """Add a finished match to the players' stats."""
+        if self.writeback is None:
+            return
+        winner = match.winner()
+        self.writeback.add_win(match.players[winner])
+        self.writeback.add_loss(match.players[1 - winner])
+
 class AddPlayerUI:
     def __init__(self, root, menu):
         '''Sets up the window'''
@@ -294,9 +628,9 @@ class AddPlayerUI:
 
             # If validation passes, add the player
             new_player = Player(player_name, float(chance_value) / 100)
-            self.menu.players.append(new_player)
-            print(new_player)
             self.add_player_to_file(new_player)
+            self.menu.add_players([new_player])
+            print(new_player)
 
             # Clear input fields
             self.name_entry.delete(0, tk.END)
@@ -308,5 +642,8 @@ class AddPlayerUI:
 
     
     def add_player_to_file(self, player):
+        if self.menu.store is not None:
+            self.menu.store.add(player)
+            return
         with open("players.txt", "a") as file:
             file.write(f"\n{player.name}\n{player.chance_to_win}\n0\n0")  # Default wins and losses are set to 0
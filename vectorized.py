@@ -0,0 +1,244 @@
+'''
+Vectorized Monte Carlo simulation of many independent matches at once.
+
+Every match in the batch is a row in a set of NumPy arrays, and each step of
+the loop plays one point in all unfinished matches with masked array updates.
+'''
+
+import numpy as np
+from scoring import CLASSIC, tiebreak_server_swapped
+
+class BatchResult:
+    '''Outcome of a batch of simulated matches between the same two players.'''
+    def __init__(self, winners, sets_won, sets, point_counts):
+        """
+        Initialize a new BatchResult instance.
+
+        Parameters:
+        winners (ndarray): Index of the winner (0 or 1) of every match.
+        sets_won (ndarray): Sets won by each player, shape (n, 2).
+        sets (ndarray): Games won by each player in every set, shape (n, sets in the format, 2).
+        point_counts (ndarray): Number of points played in every match.
+        """
+        self.winners = winners
+        self.sets_won = sets_won
+        self.sets = sets
+        self.point_counts = point_counts
+
+    def __len__(self):
+        return len(self.winners)
+
+    def win_probability(self, player_index=0):
+        """
+        Return the share of matches won by the given player.
+
+        Parameters:
+        player_index (int): The index of the player (0 or 1).
+        """
+        return float(np.mean(self.winners == player_index))
+
+    def scoreline_distribution(self):
+        """
+        Return the share of matches ending in each sets score.
+
+        Returns:
+        dict: Maps (sets won by player 0, sets won by player 1) to its share of the matches.
+        """
+        lines, counts = np.unique(self.sets_won, axis = 0, return_counts = True)
+        return {(int(line[0]), int(line[1])): float(count / len(self)) for line, count in zip(lines, counts)}
+
+    def set_score_distribution(self, set_index=0):
+        """
+        Return the share of played sets ending in each games score.
+
+        Parameters:
+        set_index (int): The index of the set, starting at 0.
+
+        Returns:
+        dict: Maps (games of player 0, games of player 1) to its share of the sets played.
+        """
+        games = self.sets[:, set_index]
+        games = games[games.sum(axis = 1) > 0]  # Third sets are not always played
+        if len(games) == 0:
+            return {}
+        lines, counts = np.unique(games, axis = 0, return_counts = True)
+        return {(int(line[0]), int(line[1])): float(count / len(games)) for line, count in zip(lines, counts)}
+
+    def __str__(self):
+        return f"Matches: {len(self)} | P(player 0 wins): {self.win_probability(0):.4f}"
+
+def draw_uniforms(rng, ids, n, antithetic=False):
+    """
+    Draw one uniform number for every unfinished match.
+
+    Parameters:
+    rng (numpy.random.Generator): The generator to draw from.
+    ids (ndarray): The indices of the unfinished matches.
+    n (int): Number of matches in the batch.
+    antithetic (bool, optional): Pair match i with match i + (n + 1) // 2 and give the
+    second one 1 - U wherever the first one gets U.
+
+    Returns:
+    ndarray: The uniform numbers, in the order of ids.
+    """
+    if not antithetic:
+        return rng.random(len(ids))
+    half = rng.random((n + 1) // 2)
+    return np.concatenate((half, 1 - half))[ids]
+
+def server_wins_points(server_uniform, receiver_uniform, server_power, receiver_power):
+    """
+    Turn uniform numbers into one rolled point in every match and return where the server won it.
+
+    The server's best-of-three roll is distributed like U ** (1 / 3) and the receiver's
+    best-of-two roll like V ** (1 / 2), so one random number per roll is enough.
+    Both sides are compared raised to the sixth power, which turns the roots into
+    plain multiplications without changing any outcome.
+
+    Parameters:
+    server_uniform (ndarray): The uniform number behind the server's roll in every match.
+    receiver_uniform (ndarray): The uniform number behind the receiver's roll in every match.
+    server_power (ndarray): The server's chance_to_win to the sixth power in every match.
+    receiver_power (ndarray): The receiver's chance_to_win to the sixth power in every match.
+
+    Returns:
+    ndarray: True where the server won the point.
+    """
+    server_roll = server_uniform * server_uniform
+    receiver_roll = receiver_uniform * receiver_uniform
+    server_roll *= server_power
+    receiver_roll *= receiver_uniform
+    receiver_roll *= receiver_power
+    return server_roll >= receiver_roll
+
+def simulate_matches(player_1, player_2, n, seed=None, rng=None, antithetic=False, match_format=CLASSIC):
+    """
+    Simulate n independent matches between two players.
+
+    Follows the same rules as Match, through the same scoring tables: player 1
+    serves when an even number of games has been played in the set, and the
+    format decides how games, sets and the match are won.
+
+    Parameters:
+    player_1 (Player): The first player, who serves first in every set.
+    player_2 (Player): The second player.
+    n (int): Number of matches to simulate.
+    seed (int or numpy.random.SeedSequence, optional): Seed for a new generator, used if rng is not given.
+    rng (numpy.random.Generator, optional): The generator to draw the rolls from, for example
+    streams.numpy_stream(root_seed, batch_index) so every batch of a run has its own stream.
+    antithetic (bool, optional): Play the second half of the batch with mirrored rolls (1 - U) of
+    the first half, so match i and match i + (n + 1) // 2 are negatively correlated.
+    match_format (MatchFormat, optional): The rules, see scoring.py. Defaults to best of three advantage sets.
+
+    Returns:
+    BatchResult: The outcome of every match.
+    """
+    if rng is None:
+        rng = np.random.default_rng(seed)
+    n = int(n)
+    tables = match_format.arrays()
+    point_next = tables["point_next"].astype(np.intp)  # Indexing with intp needs no conversion
+    set_next = tables["set_next"]
+    set_tiebreak_next = tables["set_tiebreak_next"]
+    sets_to_win = match_format.sets_to_win
+
+    # Sixth powers of the chances, indexed by whether player 1 is serving
+    server_powers = np.array([player_2.chance_to_win, player_1.chance_to_win]) ** 6
+    receiver_powers = server_powers[::-1].copy()
+
+    # Results, filled in as matches finish
+    winners = np.zeros(n, dtype = np.int8)
+    sets_won = np.zeros((n, 2), dtype = np.int8)
+    sets = np.zeros((n, match_format.best_of, 2), dtype = np.int16)
+    point_counts = np.zeros(n, dtype = np.int32)
+
+    # State of the unfinished matches only, one array per counter
+    ids = np.arange(n)
+    point_state = np.full(n, match_format.game_start, dtype = np.intp)
+    in_tiebreak = np.zeros(n, dtype = bool)
+    game_points = np.zeros(n, dtype = np.int16)
+    set_state = np.full(n, match_format.set_start, dtype = np.int16)
+    games_1 = np.zeros(n, dtype = np.int16)
+    games_2 = np.zeros(n, dtype = np.int16)
+    sets_1 = np.zeros(n, dtype = np.int8)
+    sets_2 = np.zeros(n, dtype = np.int8)
+    played = np.zeros(n, dtype = np.int32)
+
+    while len(ids):
+        # Player 1 serves on an even number of games, like Match.server()
+        player_1_serves = ((games_1 + games_2) & 1) == 0
+        if match_format.tiebreak:
+            player_1_serves ^= in_tiebreak & tiebreak_server_swapped(game_points)
+            game_points += 1
+        serving = player_1_serves.view(np.int8)
+        server_power = server_powers[serving]
+        receiver_power = receiver_powers[serving]
+        if antithetic:
+            # Uniforms belong to players rather than to server and receiver, so mirrored
+            # matches stay mirrored for player 1 even when their serve order differs
+            uniform_1 = draw_uniforms(rng, ids, n, antithetic)
+            uniform_2 = draw_uniforms(rng, ids, n, antithetic)
+            server_uniform = np.where(player_1_serves, uniform_1, uniform_2)
+            receiver_uniform = np.where(player_1_serves, uniform_2, uniform_1)
+        else:
+            server_uniform = rng.random(len(ids))
+            receiver_uniform = rng.random(len(ids))
+        player_1_wins = server_wins_points(server_uniform, receiver_uniform, server_power, receiver_power) == player_1_serves
+        player_2_wins = ~player_1_wins
+        point_state = point_next[point_state * 2 + player_2_wins]
+        played += 1
+
+        game_over = point_state < 0
+        if not game_over.any():
+            continue
+
+        # The point winner won the game, look up the new games score of those sets
+        games_1 += game_over & player_1_wins
+        games_2 += game_over & player_2_wins
+        finished_games = np.flatnonzero(game_over)
+        set_state[finished_games] = set_next[set_state[finished_games] * 2 + player_2_wins[finished_games]]
+
+        set_over = set_state < 0
+        if set_over.any():
+            set_index = sets_1[set_over] + sets_2[set_over]
+            sets[ids[set_over], set_index, 0] = games_1[set_over]
+            sets[ids[set_over], set_index, 1] = games_2[set_over]
+            sets_1 += set_over & player_1_wins
+            sets_2 += set_over & player_2_wins
+            games_1[set_over] = 0
+            games_2[set_over] = 0
+            set_state[set_over] = match_format.set_start
+
+        # Start the next game, which is a tiebreak at 6-6 if the format has them
+        if match_format.tiebreak:
+            starts_tiebreak = set_tiebreak_next[set_state[finished_games]]
+            in_tiebreak[finished_games] = starts_tiebreak
+            point_state[finished_games] = np.where(starts_tiebreak, match_format.tiebreak_start, match_format.game_start)
+            game_points[finished_games] = 0
+        else:
+            point_state[finished_games] = match_format.game_start
+
+        match_over = set_over & ((sets_1 == sets_to_win) | (sets_2 == sets_to_win))
+        if not match_over.any():
+            continue
+
+        # Store the finished matches and drop them from the state arrays
+        done = ids[match_over]
+        winners[done] = sets_2[match_over] == sets_to_win
+        sets_won[done, 0] = sets_1[match_over]
+        sets_won[done, 1] = sets_2[match_over]
+        point_counts[done] = played[match_over]
+
+        keep = ~match_over
+        ids = ids[keep]
+        point_state = point_state[keep]
+        in_tiebreak = in_tiebreak[keep]
+        game_points = game_points[keep]
+        set_state = set_state[keep]
+        games_1 = games_1[keep]
+        games_2 = games_2[keep]
+        sets_1 = sets_1[keep]
+        sets_2 = sets_2[keep]
+        played = played[keep]
+
+    return BatchResult(winners, sets_won, sets, point_counts)
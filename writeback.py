@@ -0,0 +1,112 @@
+'''
+Buffered write-back of match results to the player store or 'players.txt'.
+'''
+
+import threading
+import time
+from player import apply_deltas_to_file
+
+class StatWriteBack:
+    '''Collects win and loss deltas in memory and saves them in one atomic write.'''
+    def __init__(self, target="players.txt", max_pending=1000, max_delay=5.0):
+        """
+        Initialize a new StatWriteBack instance.
+
+        Parameters:
+        target (PlayerStore or str): The store to save to, or the path to a 'players.txt' style file.
+        max_pending (int, optional): Flush once this many results are buffered.
+        max_delay (float, optional): Flush once the oldest buffered result is this many seconds old.
+        """
+        self.target = target
+        self.max_pending = max_pending
+        self.max_delay = max_delay
+        self.deltas = {}  # Player name -> [wins, losses] not yet saved
+        self.pending = 0
+        self.oldest = None  # Time of the oldest unsaved result
+        self.timer = None  # Flushes the buffer max_delay seconds after its oldest result
+        self.lock = threading.Lock()
+
+    def record(self, player, wins=0, losses=0):
+        """
+        Buffer wins and losses that have already been added to a player.
+
+        Parameters:
+        player (Player): The player the results belong to.
+        wins (int, optional): Number of wins to save.
+        losses (int, optional): Number of losses to save.
+        """
+        with self.lock:
+            self.add_delta(player, wins, losses)
+            due = self.pending >= self.max_pending
+        if due:
+            self.flush()
+
+    def record_many(self, records):
+        """
+        Buffer the results of many players and save everything buffered in one write.
+
+        Unlike record() this never flushes part way, so a batch like a season is
+        saved whole or not at all.
+
+        Parameters:
+        records (iterable): (player, wins, losses) for every player.
+        """
+        with self.lock:
+            for player, wins, losses in records:
+                self.add_delta(player, wins, losses)
+        self.flush()
+
+    def add_delta(self, player, wins, losses):
+        """Add to the buffer. The caller holds the lock."""
+        delta = self.deltas.setdefault(player.name, [0, 0])
+        delta[0] += wins
+        delta[1] += losses
+        self.pending += wins + losses
+        if self.oldest is None:
+            self.oldest = time.monotonic()
+            self.start_timer()
+
+    def start_timer(self):
+        """Flush max_delay seconds from now, even if no other result arrives. The caller holds the lock."""
+        self.timer = threading.Timer(self.max_delay, self.flush)
+        self.timer.daemon = True
+        self.timer.start()
+
+    def add_win(self, player):
+        """Give a player a win and buffer it."""
+        player.add_win()
+        self.record(player, wins = 1)
+
+    def add_loss(self, player):
+        """Give a player a loss and buffer it."""
+        player.add_loss()
+        self.record(player, losses = 1)
+
+    def flush(self):
+        """Save all buffered results in a single write."""
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            if not self.deltas:
+                return
+
+            # Either a single transaction or a temp file renamed over 'players.txt'.
+            # The buffer is only cleared once the write has succeeded.
+            try:
+                if isinstance(self.target, str):
+                    apply_deltas_to_file(self.deltas, self.target)
+                else:
+                    self.target.apply_deltas(self.deltas)
+            except Exception:
+                self.start_timer()  # Try again later
+                raise
+            self.deltas = {}
+            self.pending = 0
+            self.oldest = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()